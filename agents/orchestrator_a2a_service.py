@@ -694,4 +694,13 @@ if __name__ == "__main__":
         service = await create_orchestrator_a2a_service()
         await service.start()
 
-    asyncio.run(main())
\ No newline at end of file
+    # Use uvloop's faster event loop when available
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
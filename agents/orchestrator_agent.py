@@ -15,16 +15,26 @@ Key Features:
 """
 
 import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
 import json
 import logging
 import uuid
 import os
-import subprocess
+import random
+import re
+import secrets
+import socket
 import tempfile
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
-from aiohttp import web, ClientSession
+import time
+from datetime import datetime, timedelta, timezone
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Callable, Dict, Any, Optional, List, Union
+from dataclasses import dataclass, field
+from aiohttp import web
 import aiohttp_cors
 
 # Optional HTTP client for A2A
@@ -34,6 +44,13 @@ try:
 except ImportError:
     HTTPX_AVAILABLE = False
 
+# Optional fast JSON encoder/decoder
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Direct ADK imports - using the official google/adk-python library
 try:
     from google.adk.agents import Agent, LlmAgent
@@ -56,6 +73,133 @@ except ImportError:
     A2A_AVAILABLE = False
 
 
+# Fallback stage results used when an A2A call fails; copied before being stored on a workflow
+_MOCK_ANALYSIS = MappingProxyType({
+    'classification': 'Backend Error',
+    'failing_service': 'unknown-service',
+    'summary': 'A2A communication failed, using mock analysis',
+    'confidence_score': 0.8,
+    'evidence_count': 1
+})
+
+_MOCK_REMEDIATION = MappingProxyType({
+    'type': 'restart_service',
+    'service': 'unknown-service',
+    'risk_level': 'medium',
+    'description': 'A2A communication failed, using mock remediation proposal'
+})
+
+_MOCK_APPROVAL = MappingProxyType({
+    'decision': 'approve',
+    'user_id': 'system',
+    'reason': 'A2A communication failed, auto-approved for testing'
+})
+
+_MOCK_EXECUTION = MappingProxyType({
+    'success': True,
+    'duration_seconds': 30,
+    'actions_taken': ('A2A communication failed, mock service restart',),
+    'verification_status': 'passed'
+})
+
+
+class Svc(IntEnum):
+    """Downstream A2A services, used as indexes into the A2A client array"""
+    RCA = 0
+    APPROVAL = 1
+    REMEDIATION = 2
+    TOPOLOGY = 3
+
+
+_SVC_MAP: Dict[str, Svc] = {svc.name.lower(): svc for svc in Svc}
+
+# MCP server configuration; defaults to the mcp-servers directory of this repo
+_MCP_SERVERS_DIR = os.getenv(
+    "MCP_SERVERS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "mcp-servers")
+)
+_MCP_CONFIG_PATH = os.getenv("MCP_CONFIG", os.path.join(_MCP_SERVERS_DIR, "mcp.json"))
+_GCP_OBS_SERVER_PATH = os.path.join(_MCP_SERVERS_DIR, "gcp_observability_server.py")
+
+# Process environment snapshot that per-server MCP env overrides are merged onto
+_BASE_ENV: Dict[str, str] = dict(os.environ)
+
+_TOOL_NAME_RE = re.compile(r'Tool\s*\(\s*name="([^"]+)"')
+
+# Static tool catalogs for MCP servers that don't support --list-tools
+_FALLBACK_OBS_TOOLS = MappingProxyType({
+    "correlate-telemetry": {"name": "correlate-telemetry", "description": "Correlate telemetry data"},
+    "build-failure-timeline": {"name": "build-failure-timeline", "description": "Build failure timeline"}
+})
+
+_K8S_TOOLS = MappingProxyType({
+    "get_pods": {"name": "get_pods", "description": "Get Kubernetes pods"},
+    "get_services": {"name": "get_services", "description": "Get Kubernetes services"},
+    "get_deployments": {"name": "get_deployments", "description": "Get Kubernetes deployments"},
+    "get_namespaces": {"name": "get_namespaces", "description": "Get Kubernetes namespaces"},
+    "get_nodes": {"name": "get_nodes", "description": "Get Kubernetes nodes"},
+    "describe_pod": {"name": "describe_pod", "description": "Describe a specific Kubernetes pod"},
+    "get_events": {"name": "get_events", "description": "Get Kubernetes events"},
+    "get_logs": {"name": "get_logs", "description": "Get pod logs"},
+    "apply_manifest": {"name": "apply_manifest", "description": "Apply Kubernetes manifest"},
+    "delete_resource": {"name": "delete_resource", "description": "Delete Kubernetes resource"}
+})
+
+_PLAYWRIGHT_TOOLS = MappingProxyType({
+    "run_test": {"name": "run_test", "description": "Run Playwright test"},
+    "capture_screenshot": {"name": "capture_screenshot", "description": "Capture screenshot"},
+    "get_test_results": {"name": "get_test_results", "description": "Get test results"},
+    "record_trace": {"name": "record_trace", "description": "Record execution trace"},
+    "generate_report": {"name": "generate_report", "description": "Generate test report"},
+    "browser_context": {"name": "browser_context", "description": "Manage browser context"}
+})
+
+_GEMINI_TOOLS = MappingProxyType({
+    "analyze_gcp_issue": {"name": "analyze_gcp_issue", "description": "Analyze GCP issues using Gemini"},
+    "suggest_solution": {"name": "suggest_solution", "description": "Suggest solutions for problems"},
+    "get_best_practices": {"name": "get_best_practices", "description": "Get GCP best practices"},
+    "troubleshoot_service": {"name": "troubleshoot_service", "description": "Troubleshoot GCP service issues"},
+    "analyze_logs": {"name": "analyze_logs", "description": "Analyze log patterns with AI"},
+    "generate_runbook": {"name": "generate_runbook", "description": "Generate operational runbooks"}
+})
+
+
+@functools.lru_cache(maxsize=32)
+def _load_mcp_config(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse mcp.json; keyed by mtime so edits to the file invalidate the cache"""
+    with open(path, 'r') as f:
+        return _json_loads(f.read())
+
+
+@functools.lru_cache(maxsize=32)
+def _tools_from_source(path: str, mtime: float) -> tuple:
+    """Extract Tool(name=...) declarations from an MCP server source file"""
+    with open(path, 'r') as f:
+        return tuple(_TOOL_NAME_RE.findall(f.read()))
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with orjson when available; both raise json.JSONDecodeError subclasses"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Any, indent: bool = False) -> str:
+    """Encode JSON to str with orjson when available"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option).decode()
+    return json.dumps(data, indent=2 if indent else None)
+
+
+def _json_response(data: Dict[str, Any], status: int = 200) -> web.Response:
+    """Build a JSON web response, encoding with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return web.Response(body=orjson.dumps(data), status=status, content_type="application/json")
+    return web.json_response(data, status=status)
+
+
 @dataclass
 class AgentConfig:
     """Configuration for ADK agents"""
@@ -79,9 +223,35 @@ class FailurePayload:
     video_url: Optional[str] = None
     trace_url: Optional[str] = None
     timestamp: Optional[str] = None
+    _wire: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
+    def as_wire(self) -> Dict[str, Any]:
+        """Shallow dict for A2A payloads, built once; error is shared by reference, not deep-copied"""
+        if self._wire is None:
+            self._wire = {
+                "test_title": self.test_title,
+                "status": self.status,
+                "error": self.error,
+                "retries": self.retries,
+                "trace_id": self.trace_id,
+                "video_url": self.video_url,
+                "trace_url": self.trace_url,
+                "timestamp": self.timestamp
+            }
+        return self._wire
 
-@dataclass
+    def summary_view(self) -> Dict[str, Any]:
+        """Slim projection of the failure sent with approval requests"""
+        return {
+            "test_title": self.test_title,
+            "trace_id": self.trace_id,
+            "status": self.status,
+            "error_type": self.error.get('type', 'Error'),
+            "error_message": self.error.get('message', '')
+        }
+
+
+@dataclass(slots=True)
 class WorkflowState:
     """State of an incident response workflow"""
     workflow_id: str
@@ -96,6 +266,121 @@ class WorkflowState:
     execution_result: Optional[Dict[str, Any]] = None
     topology_data: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
+    inflight: Optional[asyncio.Task] = None  # outstanding A2A call, cancelled by _fail_workflow
+    topology_task: Optional[asyncio.Task] = None  # topology fetch running alongside RCA, if enabled
+    # time.monotonic() stamps used for timeouts and durations; the datetimes are for display
+    created_mono: float = 0.0
+    updated_mono: float = 0.0
+    correlation_id: str = field(init=False, default="")
+
+    def __post_init__(self):
+        self.correlation_id = f"wf-{self.workflow_id}"
+
+
+class WorkflowAborted(Exception):
+    """Raised when a workflow is failed while one of its A2A calls is in flight"""
+
+
+# (workflow_id, correlation_id) of the workflow stage running in the current task
+_WORKFLOW_CTX: contextvars.ContextVar = contextvars.ContextVar("workflow", default=("-", "-"))
+
+
+class _WorkflowContextFilter(logging.Filter):
+    """Attach the current workflow_id and correlation_id to log records"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.workflow_id, record.correlation_id = _WORKFLOW_CTX.get()
+        return True
+
+
+def _rca_payload(ws: WorkflowState) -> Dict[str, Any]:
+    fp = ws.failure_payload
+    return {
+        "failure_payload": {
+            "test_title": fp.test_title,
+            "status": fp.status,
+            "error_message": fp.error.get('message', str(fp.error)),
+            "error_stack": fp.error.get('stack', ''),
+            "error_type": fp.error.get('type', 'Error'),
+            "retries": fp.retries,
+            "trace_id": fp.trace_id,
+            "timestamp": fp.timestamp
+        }
+    }
+
+
+def _propose_payload(ws: WorkflowState) -> Dict[str, Any]:
+    return {
+        "workflow_id": ws.workflow_id,
+        "incident_id": ws.incident_id,
+        "analysis_result": ws.analysis_result,
+        "topology_data": ws.topology_data,
+    }
+
+
+def _approval_payload(ws: WorkflowState) -> Dict[str, Any]:
+    """Approval request body; the failure goes out as failure_summary (FailurePayload.summary_view), not in full"""
+    return {
+        "workflow_id": ws.workflow_id,
+        "incident_id": ws.incident_id,
+        "analysis_result": ws.analysis_result,
+        "remediation_action": ws.remediation_action,
+        "failure_summary": ws.failure_payload.summary_view()
+    }
+
+
+def _execute_payload(ws: WorkflowState) -> Dict[str, Any]:
+    return {
+        "workflow_id": ws.workflow_id,
+        "incident_id": ws.incident_id,
+        "remediation_action": ws.remediation_action,
+        "approval_response": ws.approval_response,
+    }
+
+
+def _mock_remediation(ws: WorkflowState) -> Dict[str, Any]:
+    analysis = ws.analysis_result
+    service = analysis.get('failing_service', 'unknown-service') if analysis else 'unknown-service'
+    return {**_MOCK_REMEDIATION, 'service': service}
+
+
+@dataclass(frozen=True, slots=True)
+class StageSpec:
+    """One A2A step of the incident workflow, run by OrchestratorAgent._run_stage"""
+    name: str
+    agents_attr: str  # OrchestratorAgent attribute listing the agents that serve this stage
+    agent_label: str
+    status: str
+    service: Svc
+    skill_attr: str  # OrchestratorAgent attribute holding the resolved skill name
+    timeout: float
+    build_payload: Callable[[WorkflowState], Dict[str, Any]]
+    handler: str  # OrchestratorAgent method called with (workflow_id, result)
+    mock: Callable[[WorkflowState], Dict[str, Any]]
+    description: str  # for log and error messages
+    fallback: str
+    triggered_event: str
+    fallback_event: str
+    prefetch_topology: bool = False
+
+
+_STAGES = MappingProxyType({spec.name: spec for spec in (
+    StageSpec('rca', 'rca_agents', 'RCA', 'analyzing', Svc.RCA, '_rca_skill', 45.0,
+              _rca_payload, '_handle_analysis_complete', lambda ws: dict(_MOCK_ANALYSIS),
+              'RCA analysis', 'mock analysis', 'rca_analysis_triggered', 'rca_a2a_failed_mock_fallback',
+              prefetch_topology=True),
+    StageSpec('propose', 'remediation_agents', 'remediation', 'proposing', Svc.REMEDIATION, '_propose_skill', 60.0,
+              _propose_payload, '_handle_remediation_proposed', _mock_remediation,
+              'remediation proposal', 'mock proposal', 'remediation_proposal_triggered',
+              'remediation_a2a_failed_mock_fallback'),
+    StageSpec('approval', 'approval_agents', 'approval', 'awaiting_approval', Svc.APPROVAL, '_approval_skill', 45.0,
+              _approval_payload, '_handle_approval_received', lambda ws: dict(_MOCK_APPROVAL),
+              'approval request', 'auto-approval', 'approval_request_triggered', 'approval_a2a_failed_mock_fallback'),
+    StageSpec('execute', 'remediation_agents', 'remediation', 'executing', Svc.REMEDIATION, '_execute_skill', 90.0,
+              _execute_payload, '_handle_execution_complete', lambda ws: dict(_MOCK_EXECUTION),
+              'remediation execution', 'mock execution', 'remediation_execution_triggered',
+              'remediation_a2a_failed_mock_fallback'),
+)})
 
 
 class OrchestratorAgent:
@@ -112,6 +397,11 @@ class OrchestratorAgent:
     7. Maintains workflow state and error recovery
     8. Logs all workflow events via MCP
     """
+
+    # Fields a Playwright failure webhook payload must carry
+    _REQUIRED_FIELDS = frozenset({'test_title', 'status', 'error', 'retries', 'trace_id'})
+    # Terminal workflow statuses; such workflows are only kept around for status queries
+    _FINISHED_STATUSES = frozenset({'completed', 'failed'})
     
     def __init__(self, agent_id: Optional[str] = None, webhook_port: int = 8080):
         if agent_id is None:
@@ -119,6 +409,7 @@ class OrchestratorAgent:
             
         self.agent_id = agent_id
         self.logger = logging.getLogger(f"{__name__}.{agent_id}")
+        self.logger.addFilter(_WorkflowContextFilter())
 
         # Initialize ADK-related components
         if ADK_AVAILABLE:
@@ -150,9 +441,28 @@ class OrchestratorAgent:
         # A2A client for inter-agent communication
         self.a2a_client = None
         
-        # MCP session for audit logging and notifications
+        # MCP session for audit logging and notifications; discovered lazily on first tool use
         self.mcp_session = None
-        
+        self.mcp_tools: Dict[str, Dict[str, Any]] = {}
+        self.mcp_k8s_tools: Dict[str, Dict[str, Any]] = {}
+        self.mcp_servers: Dict[str, Dict[str, Any]] = {}
+        self._mcp_ready = False
+        self._mcp_lock = asyncio.Lock()
+        # stdio MCP servers being queried during discovery, and the tool lists they reported, keyed by server name
+        self._mcp_subprocesses: Dict[str, asyncio.subprocess.Process] = {}
+        self._mcp_server_tools: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._mcp_rpc_ids = itertools.count(1)
+
+        # Queued MCP event log, drained in batches by _mcp_flush_worker; None stops the worker
+        self._mcp_queue: asyncio.Queue = asyncio.Queue()
+        self._mcp_flush_task: Optional[asyncio.Task] = None
+        # Background tasks owned by the orchestrator; cancelled or awaited in cleanup()
+        self._bg_tasks: set = set()
+        self.mcp_batch_size = int(os.getenv("MCP_BATCH_SIZE", "100"))
+        self.mcp_flush_interval = int(os.getenv("MCP_BATCH_MS", "200")) / 1000  # seconds
+        # Fraction of non-critical MCP events (stage triggers) that are kept
+        self._mcp_sample_rate = float(os.getenv("MCP_SAMPLE_RATE", "1.0"))
+
         # Webhook server configuration
         self.webhook_port = webhook_port
         self.webhook_server = None
@@ -162,6 +472,16 @@ class OrchestratorAgent:
         # Workflow management
         self.active_workflows: Dict[str, WorkflowState] = {}
         self.workflow_timeout = timedelta(minutes=30)  # 30 minute timeout
+        # Min-heap of (updated_mono, workflow_id); entries go stale when the workflow is touched again
+        self._workflow_deadlines: List[tuple] = []
+        # workflow_id -> latest updated_mono, so heap entries are checked without touching WorkflowState
+        self._updated_mono: Dict[str, float] = {}
+        # Set when the deadline heap goes from empty to non-empty, to wake _monitor_workflows
+        self._deadlines_added = asyncio.Event()
+        # Finished workflows stay queryable for this long, then _workflow_janitor drops them
+        self.finished_workflow_ttl = 300.0  # 5 minutes
+        self._cleanup_heap: List[tuple] = []  # (monotonic expiry, workflow_id)
+        self._cleanup_added = asyncio.Event()
         
         # Service discovery and topology
         self.discovered_topologies: Dict[str, Dict[str, Any]] = {}
@@ -214,9 +534,31 @@ class OrchestratorAgent:
                 }
             }
         }
+        # Optional topology service; when configured its fetch runs concurrently with RCA
+        if os.getenv("TOPOLOGY_A2A_URL"):
+            self.services["topology"] = {
+                "a2a": {
+                    "url": os.getenv("TOPOLOGY_A2A_URL"),
+                    "skill": os.getenv("TOPOLOGY_A2A_SKILL", "get_topology_insights")
+                }
+            }
+        self._load_service_skills()
         
-        # A2A clients map per service name
+        # A2A clients map per service name (kept for debugging/API compat);
+        # the call path indexes _a2a_client_arr by Svc instead
         self.a2a_clients: Dict[str, Any] = {}
+        self._a2a_client_arr: List[Any] = [None] * len(Svc)
+        # Pooled httpx transports behind the A2A clients, closed in cleanup()
+        self._a2a_http_clients: List[Any] = []
+        
+    def _load_service_skills(self):
+        """Resolve the A2A skill names used by the workflow stages; call again if self.services changes"""
+        self._rca_skill = self.services["rca"]["a2a"].get("skill", "analyze_failure")
+        self._approval_skill = self.services["approval"]["a2a"].get("skill", "request_approval")
+        self._propose_skill = self.services["remediation"]["a2a"].get("propose_skill", "propose_remediation")
+        self._execute_skill = self.services["remediation"]["a2a"].get("execute_skill", "execute_remediation")
+        topology = self.services.get("topology")
+        self._topology_skill = topology["a2a"].get("skill", "get_topology_insights") if topology else None
         
     def _register_adk_tools(self):
         """Register ADK tools for orchestrator capabilities"""
@@ -276,6 +618,7 @@ class OrchestratorAgent:
     async def _mcp_write_log(self, severity: str, message: str, labels: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """ADK tool function to write logs via MCP"""
         try:
+            await self._ensure_mcp_initialized()
             if "write_log_entry" in self.mcp_tools:
                 # Use dynamic MCP tool execution
                 log_entry = {
@@ -295,6 +638,7 @@ class OrchestratorAgent:
     async def _mcp_query_logs(self, filter: str, start_time: Optional[str] = None, end_time: Optional[str] = None) -> Dict[str, Any]:
         """ADK tool function to query logs via MCP"""
         try:
+            await self._ensure_mcp_initialized()
             if "query_logs" in self.mcp_tools:
                 params = {"filter": filter}
                 if start_time:
@@ -312,6 +656,7 @@ class OrchestratorAgent:
     async def _mcp_get_pods(self, namespace: Optional[str] = None, label_selector: Optional[str] = None) -> Dict[str, Any]:
         """ADK tool function to get Kubernetes pods via MCP"""
         try:
+            await self._ensure_mcp_initialized()
             if "get_pods" in self.mcp_k8s_tools:
                 params = {}
                 if namespace:
@@ -329,6 +674,7 @@ class OrchestratorAgent:
     async def _mcp_correlate_telemetry(self, trace_id: str, time_window: int = 300) -> Dict[str, Any]:
         """ADK tool function to correlate telemetry via MCP"""
         try:
+            await self._ensure_mcp_initialized()
             if "correlate-telemetry" in self.mcp_tools:
                 params = {
                     "trace_id": trace_id,
@@ -345,6 +691,7 @@ class OrchestratorAgent:
     async def _mcp_build_timeline(self, trace_id: str, time_window: int = 600, include_related_traces: bool = True) -> Dict[str, Any]:
         """ADK tool function to build failure timeline via MCP"""
         try:
+            await self._ensure_mcp_initialized()
             if "build-failure-timeline" in self.mcp_tools:
                 params = {
                     "trace_id": trace_id,
@@ -368,10 +715,10 @@ class OrchestratorAgent:
                 status=failure_payload.get('status', 'failed'),
                 error=failure_payload.get('error', {}),
                 retries=failure_payload.get('retries', 0),
-                trace_id=failure_payload.get('trace_id', str(uuid.uuid4())),
+                trace_id=failure_payload.get('trace_id') or secrets.token_hex(12),
                 video_url=failure_payload.get('video_url'),
                 trace_url=failure_payload.get('trace_url'),
-                timestamp=failure_payload.get('timestamp', datetime.now().isoformat())
+                timestamp=failure_payload.get('timestamp') or datetime.now().isoformat()
             )
             
             workflow_id = await self._start_incident_workflow(payload)
@@ -577,14 +924,7 @@ class OrchestratorAgent:
             # Initialize A2A client
             await self.initialize_a2a()
             
-            # Initialize MCP session for audit logging
-            try:
-                self.mcp_session = await self._initialize_mcp_session()
-                # Register MCP tools as ADK tools after discovery
-                if ADK_AVAILABLE and self.adk_agent:
-                    self._register_mcp_tools()
-            except Exception as e:
-                self.logger.warning(f"MCP session initialization failed: {e}")
+            # MCP discovery is deferred to the first tool call (_ensure_mcp_initialized)
             
             # Start webhook server
             await self._start_webhook_server()
@@ -593,10 +933,14 @@ class OrchestratorAgent:
             await self._discover_agents()
             
             # Start workflow monitoring
-            asyncio.create_task(self._monitor_workflows())
+            self._spawn(self._monitor_workflows())
+            self._spawn(self._workflow_janitor())
+
+            # Start batched MCP event writer
+            self._mcp_flush_task = self._spawn(self._mcp_flush_worker())
             
             # Log initialization event
-            await self._log_mcp_event('orchestrator_initialized', {
+            self._log_mcp_event('orchestrator_initialized', {
                 'agent_id': self.agent_id,
                 'webhook_port': self.webhook_port,
                 'capabilities': ['workflow_orchestration', 'incident_coordination']
@@ -631,12 +975,18 @@ class OrchestratorAgent:
                         self.logger.info(f"Attempting to initialize A2A client for {svc} at {base_url}")
                         if base_url:
                             try:
-                                # Create httpx client for A2AClient
-                                httpx_client = httpx.AsyncClient(timeout=30.0)
+                                # Create a pooled, keep-alive httpx client for A2AClient
+                                httpx_client = httpx.AsyncClient(
+                                    timeout=30.0,
+                                    limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+                                )
+                                self._a2a_http_clients.append(httpx_client)
                                 self.a2a_clients[svc] = A2AClient(
                                     httpx_client=httpx_client,
                                     url=base_url
                                 )
+                                if svc in _SVC_MAP:
+                                    self._a2a_client_arr[_SVC_MAP[svc]] = self.a2a_clients[svc]
                                 self.logger.info(f"A2A client initialized for service '{svc}' at {base_url}")
                             except Exception as e:
                                 self.logger.warning(f"A2A client init failed for {svc} ({base_url}): {e}")
@@ -649,12 +999,12 @@ class OrchestratorAgent:
         except Exception as e:
             self.logger.error(f"Failed to initialize A2A client: {e}")
 
-    async def _a2a_call(self, service: str, skill: str, payload: Dict[str, Any], *, timeout: float = 30.0,
+    async def _a2a_call(self, service: Union[Svc, str], skill: str, payload: Dict[str, Any], *, timeout: float = 30.0,
                          correlation_id: Optional[str] = None) -> Dict[str, Any]:
         """A2A invocation with proper error handling (no REST fallback).
 
         Args:
-            service: logical service key (e.g., 'rca', 'approval')
+            service: logical service (Svc member, or key such as 'rca', 'approval')
             skill: A2A skill name to invoke
             payload: input payload for the skill
             timeout: request timeout in seconds
@@ -666,8 +1016,15 @@ class OrchestratorAgent:
         Raises:
             Exception: If A2A call fails
         """
+        if isinstance(service, str):
+            svc = _SVC_MAP.get(service)
+            if svc is None:
+                raise RuntimeError(f"No A2A client available for service '{service}'")
+            service = svc
+        name = service.name.lower()
+
         # Use A2A client if present
-        client = self.a2a_clients.get(service)
+        client = self._a2a_client_arr[service]
         if client is not None:
             try:
                 # The A2A SDK API may vary; attempt a generic 'invoke' or 'call' pattern
@@ -676,102 +1033,104 @@ class OrchestratorAgent:
                 elif hasattr(client, "call"):
                     return await asyncio.wait_for(client.call(skill, payload), timeout=timeout)
                 else:
-                    raise RuntimeError(f"A2A client for {service} has no invoke/call method")
+                    raise RuntimeError(f"A2A client for {name} has no invoke/call method")
             except Exception as e:
-                await self._log_mcp_event('a2a_call_failed', {
-                    'service': service,
+                self._log_mcp_event('a2a_call_failed', {
+                    'service': name,
                     'skill': skill,
                     'error': str(e),
                     'correlation_id': correlation_id
                 })
-                raise RuntimeError(f"A2A call failed for {service}.{skill}: {e}")
+                raise RuntimeError(f"A2A call failed for {name}.{skill}: {e}")
         else:
-            raise RuntimeError(f"No A2A client available for service '{service}'")
-
-    async def _http_post(self, url: str, body: Dict[str, Any], *, headers: Dict[str, str], timeout: float) -> Dict[str, Any]:
-        """Helper to POST JSON with aiohttp and return JSON."""
-        import aiohttp
-        if not url:
-            raise ValueError("Missing REST endpoint URL")
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=body, headers=headers, timeout=timeout) as resp:
-                text = await resp.text()
-                if resp.status >= 400:
-                    raise RuntimeError(f"HTTP {resp.status} response from {url}: {text}")
-                try:
-                    return json.loads(text)
-                except json.JSONDecodeError:
-                    return {"raw": text}
-    
+            raise RuntimeError(f"No A2A client available for service '{name}'")
+
+    async def _stage_a2a_call(self, workflow_state: WorkflowState, service: Svc, skill: str,
+                              payload: Dict[str, Any], *, timeout: float) -> Dict[str, Any]:
+        """Run a workflow stage's A2A call as a child task bounded by the workflow deadline.
+
+        The deadline is the workflow's creation time plus workflow_timeout, so it does not move as
+        stages touch the workflow. Running out of it fails the workflow; so does _fail_workflow
+        cancelling the child task. Both surface here as WorkflowAborted so the trigger can stop
+        instead of falling back to mock results.
+        """
+        remaining = workflow_state.created_mono + self.workflow_timeout.total_seconds() - time.monotonic()
+        if remaining <= 0:
+            await self._fail_workflow(workflow_state.workflow_id, "Workflow timeout")
+            raise WorkflowAborted(f"Workflow {workflow_state.workflow_id} timed out before {skill}")
+        call = asyncio.ensure_future(self._a2a_call(
+            service, skill, payload, timeout=min(timeout, remaining), correlation_id=workflow_state.correlation_id
+        ))
+        workflow_state.inflight = call
+        try:
+            return await call
+        except asyncio.CancelledError:
+            if call.cancelled() and not asyncio.current_task().cancelling():
+                raise WorkflowAborted(f"Workflow {workflow_state.workflow_id} failed during {skill}")
+            raise
+        except Exception:
+            # Cut short by the workflow deadline rather than the stage's own timeout
+            if remaining < timeout and time.monotonic() >= workflow_state.created_mono + self.workflow_timeout.total_seconds():
+                await self._fail_workflow(workflow_state.workflow_id, "Workflow timeout")
+                raise WorkflowAborted(f"Workflow {workflow_state.workflow_id} timed out during {skill}")
+            raise
+        finally:
+            workflow_state.inflight = None
+
+    async def _ensure_mcp_initialized(self):
+        """Run MCP discovery once, on first use of an MCP tool"""
+        if self._mcp_ready:
+            return
+        async with self._mcp_lock:
+            if self._mcp_ready:
+                return
+            try:
+                self.mcp_session = await self._initialize_mcp_session()
+                # Register MCP tools as ADK tools after discovery
+                if ADK_AVAILABLE and self.adk_agent:
+                    self._register_mcp_tools()
+            except Exception as e:
+                self.logger.warning(f"MCP session initialization failed: {e}")
+            self._mcp_ready = True
+
     async def _initialize_mcp_session(self):
         """Initialize MCP session for audit logging and observability tools"""
         try:
-            import json
-            
             # Initialize MCP tools dictionaries
             self.mcp_tools = {}
             self.mcp_k8s_tools = {}
             
             # Load MCP server configuration from mcp.json
-            mcp_config_path = "/Users/abhitalluri/selfhealgke/mcp-servers/mcp.json"
+            mcp_config_path = _MCP_CONFIG_PATH
             self.mcp_servers = {}
             
             try:
-                with open(mcp_config_path, 'r') as f:
-                    mcp_config = json.loads(f.read())
-                    self.mcp_servers = mcp_config.get("mcpServers", {})
-                    self.logger.info(f"Loaded MCP configuration with {len(self.mcp_servers)} servers: {list(self.mcp_servers.keys())}")
+                mcp_config = _load_mcp_config(mcp_config_path, os.path.getmtime(mcp_config_path))
+                self.mcp_servers = dict(mcp_config.get("mcpServers", {}))
+                self.logger.info(f"Loaded MCP configuration with {len(self.mcp_servers)} servers: {list(self.mcp_servers.keys())}")
             except Exception as e:
                 self.logger.warning(f"Failed to load MCP config from {mcp_config_path}: {e}")
             
-            # Try to connect to actual MCP servers via subprocess
-            
-            # Discover tools from each configured MCP server
+            # Discover tools from all enabled MCP servers concurrently
+            enabled_servers = []
             for server_name, server_config in self.mcp_servers.items():
                 if server_config.get("disabled", False):
                     self.logger.info(f"Skipping disabled MCP server: {server_name}")
                     continue
-                    
-                try:
-                    await self._discover_mcp_server_tools(server_name, server_config)
-                except Exception as e:
-                    self.logger.warning(f"Failed to discover tools from MCP server {server_name}: {e}")
-            
+                enabled_servers.append((server_name, server_config))
+
+            discoveries = [
+                self._discover_mcp_server_tools(server_name, server_config)
+                for server_name, server_config in enabled_servers
+            ]
             # Legacy: Test GCP Observability MCP server (for backward compatibility)
             if "gcp-observability" not in self.mcp_servers:
-                try:
-                    # Check if the MCP server script exists and is executable
-                    mcp_server_path = "/Users/abhitalluri/selfhealgke/mcp-servers/gcp_observability_server.py"
-                    if os.path.exists(mcp_server_path):
-                        # Try to get tools list from the actual server
-                        result = subprocess.run([
-                            "python3", mcp_server_path, "--list-tools"
-                        ], capture_output=True, text=True, timeout=10, 
-                        env={"GCP_PROJECT_ID": os.getenv("GCP_PROJECT_ID", "cogent-spirit-469200-q3")})
-                        
-                        if result.returncode == 0:
-                            # Parse tools from server response
-                            try:
-                                tools_data = json.loads(result.stdout)
-                                discovered_tools = {tool["name"]: tool for tool in tools_data.get("tools", [])}
-                                self.mcp_tools.update(discovered_tools)
-                                self.logger.info(f"Discovered {len(discovered_tools)} legacy GCP Observability tools: {list(discovered_tools.keys())}")
-                            except json.JSONDecodeError:
-                                # Fallback: scan the server file for tool definitions
-                                self._discover_tools_from_source(mcp_server_path)
-                        else:
-                            # Fallback: scan the server file for tool definitions
-                            self._discover_tools_from_source(mcp_server_path)
-                    else:
-                        self.logger.warning(f"Legacy MCP server file not found: {mcp_server_path}")
-                        
-                except Exception as e:
-                    self.logger.warning(f"Failed to discover legacy GCP Observability MCP tools: {e}")
-                    # Fallback: try to discover from source
-                    try:
-                        self._discover_tools_from_source("/Users/abhitalluri/selfhealgke/mcp-servers/gcp_observability_server.py")
-                    except Exception as fallback_e:
-                        self.logger.warning(f"Fallback tool discovery also failed: {fallback_e}")
+                discoveries.append(self._discover_legacy_observability_tools())
+
+            results = await asyncio.gather(*discoveries, return_exceptions=True)
+            for (server_name, _), result in zip(enabled_servers, results):
+                if isinstance(result, Exception):
+                    self.logger.warning(f"Failed to discover tools from MCP server {server_name}: {result}")
             
             total_tools = len(self.mcp_tools) + len(self.mcp_k8s_tools)
             if total_tools > 0:
@@ -789,13 +1148,138 @@ class OrchestratorAgent:
             self.mcp_servers = {}
             return None
             
+    async def _run_cmd(self, cmd: List[str], env: Dict[str, str], timeout: float) -> tuple:
+        """Run a command without blocking the event loop; returns (returncode, stdout, stderr)"""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+        return proc.returncode, stdout.decode(errors="replace"), stderr.decode(errors="replace")
+
+    async def _list_stdio_mcp_tools(self, server_name: str, command: str, args: List[str],
+                                    env: Dict[str, str], timeout: float = 10) -> Dict[str, Dict[str, Any]]:
+        """List tools from a stdio MCP server over one JSON-RPC session, caching the result by server name.
+
+        Tool calls do not go through these servers, so the process is stopped once it has answered.
+        """
+        if server_name in self._mcp_server_tools:
+            return self._mcp_server_tools[server_name]
+
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                command, *args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                env=env
+            )
+            self._mcp_subprocesses[server_name] = proc
+            await asyncio.wait_for(self._mcp_rpc(proc, "initialize", {
+                "protocolVersion": "2024-11-05",
+                "capabilities": {},
+                "clientInfo": {"name": "orchestrator-agent", "version": "1.0.0"}
+            }), timeout=timeout)
+            await self._mcp_notify(proc, "notifications/initialized")
+
+            result = await asyncio.wait_for(self._mcp_rpc(proc, "tools/list", {}), timeout=timeout)
+        finally:
+            await self._stop_mcp_subprocess(server_name)
+
+        tools = {tool["name"]: tool for tool in result.get("tools", [])}
+        self._mcp_server_tools[server_name] = tools
+        return tools
+
+    async def _mcp_notify(self, proc: asyncio.subprocess.Process, method: str):
+        """Send a JSON-RPC notification to a stdio MCP server"""
+        proc.stdin.write((_json_dumps({"jsonrpc": "2.0", "method": method}) + "\n").encode())
+        await proc.stdin.drain()
+
+    async def _mcp_rpc(self, proc: asyncio.subprocess.Process, method: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a JSON-RPC request to a stdio MCP server and wait for its response"""
+        request_id = next(self._mcp_rpc_ids)
+        request = {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        proc.stdin.write((_json_dumps(request) + "\n").encode())
+        await proc.stdin.drain()
+
+        while True:
+            line = await proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"MCP server exited before answering {method}")
+            try:
+                message = _json_loads(line)
+            except json.JSONDecodeError:
+                continue  # Ignore non-protocol output on stdout
+            if isinstance(message, dict) and message.get("id") == request_id:
+                if "error" in message:
+                    raise RuntimeError(f"MCP {method} failed: {message['error']}")
+                return message.get("result", {})
+
+    async def _stop_mcp_subprocess(self, server_name: str):
+        """Terminate a stdio MCP server started for discovery"""
+        proc = self._mcp_subprocesses.pop(server_name, None)
+        if proc is None or proc.returncode is not None:
+            return
+        proc.terminate()
+        try:
+            await asyncio.wait_for(proc.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+
+    async def _discover_legacy_observability_tools(self):
+        """Discover tools from the legacy GCP Observability MCP server script"""
+        try:
+            # Check if the MCP server script exists and is executable
+            mcp_server_path = _GCP_OBS_SERVER_PATH
+            try:
+                server_mtime = os.path.getmtime(mcp_server_path)
+            except OSError:
+                self.logger.warning(f"Legacy MCP server file not found: {mcp_server_path}")
+                return
+
+            # Try to get tools list from the actual server
+            returncode, stdout, _ = await self._run_cmd(
+                ["python3", mcp_server_path, "--list-tools"],
+                env={"GCP_PROJECT_ID": os.getenv("GCP_PROJECT_ID", "cogent-spirit-469200-q3")},
+                timeout=10
+            )
+            
+            if returncode == 0:
+                # Parse tools from server response
+                try:
+                    tools_data = _json_loads(stdout)
+                    discovered_tools = {tool["name"]: tool for tool in tools_data.get("tools", [])}
+                    self.mcp_tools.update(discovered_tools)
+                    self.logger.info(f"Discovered {len(discovered_tools)} legacy GCP Observability tools: {list(discovered_tools.keys())}")
+                except json.JSONDecodeError:
+                    # Fallback: scan the server file for tool definitions
+                    self._discover_tools_from_source(mcp_server_path, server_mtime)
+            else:
+                # Fallback: scan the server file for tool definitions
+                self._discover_tools_from_source(mcp_server_path, server_mtime)
+                
+        except Exception as e:
+            self.logger.warning(f"Failed to discover legacy GCP Observability MCP tools: {e}")
+            # Fallback: try to discover from source
+            try:
+                self._discover_tools_from_source(_GCP_OBS_SERVER_PATH)
+            except Exception as fallback_e:
+                self.logger.warning(f"Fallback tool discovery also failed: {fallback_e}")
+        
     async def _discover_mcp_server_tools(self, server_name: str, server_config: Dict[str, Any]):
         """Discover tools from a specific MCP server using actual configuration"""
         try:
             command = server_config.get("command", "")
             args = server_config.get("args", [])
-            env = dict(os.environ)
-            env.update(server_config.get("env", {}))
+            env = _BASE_ENV | server_config.get("env", {})
             
             self.logger.info(f"Discovering tools from MCP server: {server_name} (command: {command})")
             
@@ -804,102 +1288,65 @@ class OrchestratorAgent:
                 # Python-based MCP server - extract tools from source code since it doesn't support --list-tools
                 try:
                     # Use full path to the server file
-                    server_file = os.path.join("/Users/abhitalluri/selfhealgke/mcp-servers", "gcp_observability_server.py")
-                    if os.path.exists(server_file):
+                    server_file = _GCP_OBS_SERVER_PATH
+                    try:
+                        server_mtime = os.path.getmtime(server_file)
+                    except OSError:
+                        self.logger.warning(f"GCP observability server file not found: {server_file}")
+                        # Add fallback tools
+                        self.mcp_tools.update(_FALLBACK_OBS_TOOLS)
+                        self.logger.info(f"Added {len(_FALLBACK_OBS_TOOLS)} fallback tools for {server_name}")
+                    else:
                         # This is a pure MCP server without --list-tools support
                         # Extract tools from source code
-                        self._discover_tools_from_source(server_file)
+                        self._discover_tools_from_source(server_file, server_mtime)
                         self.logger.info(f"Discovered tools from {server_name} source code analysis")
-                    else:
-                        self.logger.warning(f"GCP observability server file not found: {server_file}")
-                        # Add fallback tools
-                        fallback_tools = {
-                            "correlate-telemetry": {"name": "correlate-telemetry", "description": "Correlate telemetry data"},
-                            "build-failure-timeline": {"name": "build-failure-timeline", "description": "Build failure timeline"}
-                        }
-                        self.mcp_tools.update(fallback_tools)
-                        self.logger.info(f"Added {len(fallback_tools)} fallback tools for {server_name}")
                 except Exception as e:
                     self.logger.warning(f"Failed to discover tools from {server_name}: {e}")
                     # Add minimal fallback tools
-                    fallback_tools = {
-                        "correlate-telemetry": {"name": "correlate-telemetry", "description": "Correlate telemetry data"}
-                    }
-                    self.mcp_tools.update(fallback_tools)
-                    self.logger.info(f"Added {len(fallback_tools)} minimal fallback tools for {server_name}")
+                    self.mcp_tools["correlate-telemetry"] = _FALLBACK_OBS_TOOLS["correlate-telemetry"]
+                    self.logger.info(f"Added 1 minimal fallback tools for {server_name}")
                     
             elif server_name in ["kubernetes", "gke-mcp"]:
-                # Kubernetes tools - known tool set based on typical MCP Kubernetes servers
-                k8s_tools = {
-                    "get_pods": {"name": "get_pods", "description": "Get Kubernetes pods"},
-                    "get_services": {"name": "get_services", "description": "Get Kubernetes services"}, 
-                    "get_deployments": {"name": "get_deployments", "description": "Get Kubernetes deployments"},
-                    "get_namespaces": {"name": "get_namespaces", "description": "Get Kubernetes namespaces"},
-                    "get_nodes": {"name": "get_nodes", "description": "Get Kubernetes nodes"},
-                    "describe_pod": {"name": "describe_pod", "description": "Describe a specific Kubernetes pod"},
-                    "get_events": {"name": "get_events", "description": "Get Kubernetes events"},
-                    "get_logs": {"name": "get_logs", "description": "Get pod logs"},
-                    "apply_manifest": {"name": "apply_manifest", "description": "Apply Kubernetes manifest"},
-                    "delete_resource": {"name": "delete_resource", "description": "Delete Kubernetes resource"}
-                }
-                
-                # Check if server is actually available
+                # Ask the live server for its tools; fall back to the known Kubernetes tool set
                 try:
-                    full_command = [command] + args + ["--version"]
-                    result = subprocess.run(
-                        full_command, 
-                        capture_output=True, text=True, timeout=10, env=env
-                    )
-                    if result.returncode == 0:
-                        self.mcp_k8s_tools.update(k8s_tools)
-                        self.logger.info(f"Added {len(k8s_tools)} Kubernetes tools from {server_name} (server available)")
-                    else:
-                        # Add tools anyway for offline usage
-                        self.mcp_k8s_tools.update(k8s_tools)
-                        self.logger.info(f"Added {len(k8s_tools)} Kubernetes tools from {server_name} (offline mode)")
+                    k8s_tools = await self._list_stdio_mcp_tools(server_name, command, args, env)
                 except Exception as e:
-                    # Add tools anyway for offline usage
+                    self.logger.debug(f"Could not list tools from {server_name}: {e}")
+                    k8s_tools = None
+                if k8s_tools:
                     self.mcp_k8s_tools.update(k8s_tools)
-                    self.logger.info(f"Added {len(k8s_tools)} Kubernetes tools from {server_name} (fallback mode)")
+                    self.logger.info(f"Added {len(k8s_tools)} Kubernetes tools from {server_name} (server available)")
+                else:
+                    # Add tools anyway for offline usage
+                    self.mcp_k8s_tools.update(_K8S_TOOLS)
+                    self.logger.info(f"Added {len(_K8S_TOOLS)} Kubernetes tools from {server_name} (offline mode)")
                 
             elif server_name == "playwright-mcp":
                 # Playwright tools
-                playwright_tools = {
-                    "run_test": {"name": "run_test", "description": "Run Playwright test"},
-                    "capture_screenshot": {"name": "capture_screenshot", "description": "Capture screenshot"}, 
-                    "get_test_results": {"name": "get_test_results", "description": "Get test results"},
-                    "record_trace": {"name": "record_trace", "description": "Record execution trace"},
-                    "generate_report": {"name": "generate_report", "description": "Generate test report"},
-                    "browser_context": {"name": "browser_context", "description": "Manage browser context"}
-                }
+                try:
+                    playwright_tools = await self._list_stdio_mcp_tools(server_name, command, args, env)
+                except Exception as e:
+                    self.logger.debug(f"Could not list tools from {server_name}: {e}")
+                    playwright_tools = None
+                playwright_tools = playwright_tools or _PLAYWRIGHT_TOOLS
                 self.mcp_tools.update(playwright_tools)
                 self.logger.info(f"Added {len(playwright_tools)} Playwright tools from {server_name}")
                 
             elif server_name == "gemini-cloud-assist":
                 # Gemini Cloud Assist tools
-                gemini_tools = {
-                    "analyze_gcp_issue": {"name": "analyze_gcp_issue", "description": "Analyze GCP issues using Gemini"},
-                    "suggest_solution": {"name": "suggest_solution", "description": "Suggest solutions for problems"},
-                    "get_best_practices": {"name": "get_best_practices", "description": "Get GCP best practices"},
-                    "troubleshoot_service": {"name": "troubleshoot_service", "description": "Troubleshoot GCP service issues"},
-                    "analyze_logs": {"name": "analyze_logs", "description": "Analyze log patterns with AI"},
-                    "generate_runbook": {"name": "generate_runbook", "description": "Generate operational runbooks"}
-                }
-                self.mcp_tools.update(gemini_tools)
-                self.logger.info(f"Added {len(gemini_tools)} Gemini Cloud Assist tools from {server_name}")
+                self.mcp_tools.update(_GEMINI_TOOLS)
+                self.logger.info(f"Added {len(_GEMINI_TOOLS)} Gemini Cloud Assist tools from {server_name}")
                 
             else:
                 self.logger.warning(f"Unknown MCP server type: {server_name}, attempting generic discovery")
                 # Try generic tool discovery
                 try:
                     full_command = [command] + args + ["--list-tools"]
-                    result = subprocess.run(
-                        full_command, 
-                        capture_output=True, text=True, timeout=10, env=env
-                    )
-                    if result.returncode == 0 and result.stdout.strip():
+                    returncode, stdout, _ = await self._run_cmd(full_command, env=env, timeout=10)
+                    if returncode == 0 and stdout.strip():
                         try:
-                            tools_data = json.loads(result.stdout)
+                            tools_data = _json_loads(stdout)
                             discovered_tools = {tool["name"]: tool for tool in tools_data.get("tools", [])}
                             self.mcp_tools.update(discovered_tools)
                             self.logger.info(f"Discovered {len(discovered_tools)} tools from {server_name}")
@@ -913,23 +1360,13 @@ class OrchestratorAgent:
         except Exception as e:
             self.logger.warning(f"Failed to discover tools from {server_name}: {e}")
             
-        except Exception as e:
-            self.logger.warning(f"MCP session initialization failed: {e}")
-            self.mcp_observability = None
-            self.mcp_kubernetes = None
-            self.mcp_tools = {}
-            self.mcp_k8s_tools = {}
-            return None
-            
-    def _discover_tools_from_source(self, server_file_path: str):
+    def _discover_tools_from_source(self, server_file_path: str, mtime: Optional[float] = None):
         """Discover MCP tools by parsing the server source file"""
         try:
-            with open(server_file_path, 'r') as f:
-                content = f.read()
-                
+            if mtime is None:
+                mtime = os.path.getmtime(server_file_path)
             # Look for Tool definitions in the source
-            import re
-            tool_patterns = re.findall(r'Tool\s*\(\s*name="([^"]+)"', content)
+            tool_patterns = _tools_from_source(server_file_path, mtime)
             
             for tool_name in tool_patterns:
                 self.mcp_tools[tool_name] = {
@@ -944,26 +1381,71 @@ class OrchestratorAgent:
         except Exception as e:
             self.logger.warning(f"Failed to discover tools from source {server_file_path}: {e}")
     
-    async def _log_mcp_event(self, event_type: str, event_data: Dict[str, Any]):
-        """Log events via MCP for audit trail and observability"""
+    def _spawn(self, coro) -> asyncio.Task:
+        """Start a background task and keep a reference to it until it finishes"""
+        task = asyncio.create_task(coro)
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+        return task
+
+    def _log_mcp_event(self, event_type: str, event_data: Dict[str, Any], ts: Optional[datetime] = None,
+                       *, critical: bool = True):
+        """Queue an event for the MCP audit trail regardless of log level; non-critical events are sampled at _mcp_sample_rate"""
+        if not critical and random.random() >= self._mcp_sample_rate:
+            return
+        # Epoch seconds; formatted to ISO-8601 UTC only when the batch is written
+        self._mcp_queue.put_nowait((ts.timestamp() if ts else time.time(), event_type, event_data))
+
+    async def _mcp_flush_worker(self):
+        """Drain queued MCP events, coalescing whatever arrives within one flush interval"""
+        queue = self._mcp_queue
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            batch = [item]
+            if queue.qsize() < self.mcp_batch_size - 1:
+                await asyncio.sleep(self.mcp_flush_interval)
+            while len(batch) < self.mcp_batch_size and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    await self._mcp_write_batch(batch)
+                    return
+                batch.append(item)
+            await self._mcp_write_batch(batch)
+
+    async def _flush_mcp_events(self):
+        """Write out everything still queued as a single batch"""
+        batch = []
+        while not self._mcp_queue.empty():
+            item = self._mcp_queue.get_nowait()
+            if item is not None:
+                batch.append(item)
+        if batch:
+            await self._mcp_write_batch(batch)
+
+    async def _mcp_write_batch(self, batch: List[tuple]):
+        """Write a batch of MCP events for audit trail and observability"""
         try:
             # Enhanced structured logging with MCP-style format
-            log_entry = {
-                "timestamp": datetime.now().isoformat(),
+            entries = [{
+                "timestamp": datetime.fromtimestamp(ts, timezone.utc).isoformat(),
                 "agent_id": self.agent_id,
                 "event_type": event_type,
                 "event_data": event_data,
                 "source": "orchestrator-agent",
                 "severity": "INFO"
-            }
-            
-            # For now, use enhanced local logging until MCP is fully configured
-            self.logger.info(f"MCP Event [{event_type}]: {json.dumps(log_entry, indent=2)}")
-            
+            } for ts, event_type, event_data in batch]
+            # For now, use enhanced local logging until MCP is fully configured; only the
+            # rendering is skipped when INFO is disabled, the events themselves are always built
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("MCP Events [%d]: %s", len(entries), _json_dumps(entries))
+
         except Exception as e:
             self.logger.warning(f"MCP logging failed: {e}")
             # Fallback to simple logging
-            self.logger.info(f"Event: {event_type} - {event_data}")
+            for _, event_type, event_data in batch:
+                self.logger.info(f"Event: {event_type} - {event_data}")
     
     async def cleanup(self):
         """Cleanup orchestrator resources"""
@@ -972,15 +1454,43 @@ class OrchestratorAgent:
             if self.server:
                 await self.server.stop()
                 
-            # Complete any active workflows
-            for workflow_id in list(self.active_workflows.keys()):
-                await self._fail_workflow(workflow_id, "System shutdown")
+            # Fail any workflows still in progress
+            unfinished = [
+                wid for wid, ws in self.active_workflows.items()
+                if ws.status not in self._FINISHED_STATUSES
+            ]
+            await self._fail_workflows(unfinished, "System shutdown")
             
             # Log cleanup event
-            await self._log_mcp_event('orchestrator_shutdown', {
+            self._log_mcp_event('orchestrator_shutdown', {
                 'agent_id': self.agent_id,
                 'active_workflows_count': len(self.active_workflows)
             })
+
+            # Stop the MCP flush worker and drain whatever is still queued
+            self.running = False
+            if self._mcp_flush_task:
+                self._mcp_queue.put_nowait(None)
+                await self._mcp_flush_task
+            await self._flush_mcp_events()
+
+            # Stop the workflow monitor and pending delayed cleanups
+            for task in self._bg_tasks:
+                task.cancel()
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+
+            # Terminate stdio MCP servers still mid-discovery
+            await asyncio.gather(
+                *(self._stop_mcp_subprocess(name) for name in list(self._mcp_subprocesses)),
+                return_exceptions=True
+            )
+
+            # Close the pooled A2A HTTP clients
+            await asyncio.gather(
+                *(client.aclose() for client in self._a2a_http_clients),
+                return_exceptions=True
+            )
+            self._a2a_http_clients.clear()
                 
             self.logger.info("Orchestrator agent cleaned up")
             
@@ -999,15 +1509,10 @@ class OrchestratorAgent:
                 self.logger.warning("No agents discovered")
                 
             # Check workflow processing
-            stuck_workflows = [
-                w for w in self.active_workflows.values()
-                if (datetime.now() - w.updated_at) > self.workflow_timeout
-            ]
-            
-            if stuck_workflows:
-                for workflow in stuck_workflows:
-                    self.logger.warning(f"Workflow {workflow.workflow_id} is stuck")
-                    await self._fail_workflow(workflow.workflow_id, "Workflow timeout")
+            stuck_ids = [w.workflow_id for w in self._pop_stuck_workflows(time.monotonic())]
+            if stuck_ids:
+                self.logger.warning(f"Workflows stuck: {stuck_ids}")
+                await self._fail_workflows(stuck_ids, "Workflow timeout")
                     
             return True
             
@@ -1015,6 +1520,47 @@ class OrchestratorAgent:
             self.logger.error(f"Health check failed: {e}")
             return False
             
+    async def _fail_workflows(self, workflow_ids: List[str], error_message: str):
+        """Fail several workflows concurrently, logging any errors together"""
+        results = await asyncio.gather(
+            *(self._fail_workflow(wid, error_message) for wid in workflow_ids),
+            return_exceptions=True
+        )
+        errors = {wid: r for wid, r in zip(workflow_ids, results) if isinstance(r, Exception)}
+        if errors:
+            self.logger.error(f"Errors while failing {len(errors)} workflows: {errors}")
+
+    def _touch_workflow(self, workflow_state: WorkflowState, now: Optional[datetime] = None,
+                        mono: Optional[float] = None) -> datetime:
+        """Mark a workflow as updated and index its new timeout deadline; returns the timestamp used"""
+        if now is None:
+            now = datetime.now()
+        workflow_state.updated_at = now
+        workflow_state.updated_mono = time.monotonic() if mono is None else mono
+        # A stage task can outlive its workflow's removal; don't re-index a workflow that is gone
+        if workflow_state.workflow_id not in self.active_workflows:
+            return now
+        self._updated_mono[workflow_state.workflow_id] = workflow_state.updated_mono
+        if not self._workflow_deadlines:
+            self._deadlines_added.set()
+        heapq.heappush(self._workflow_deadlines, (workflow_state.updated_mono, workflow_state.workflow_id))
+        return now
+
+    def _pop_stuck_workflows(self, now: float) -> List[WorkflowState]:
+        """Pop workflows not updated within the timeout as of monotonic time now, skipping stale heap entries"""
+        stuck = []
+        cutoff = now - self.workflow_timeout.total_seconds()
+        while self._workflow_deadlines and self._workflow_deadlines[0][0] < cutoff:
+            updated_mono, workflow_id = heapq.heappop(self._workflow_deadlines)
+            if self._updated_mono.get(workflow_id) == updated_mono:
+                workflow_state = self.active_workflows.get(workflow_id)
+                if workflow_state is None:
+                    # Removed after its last touch; drop the orphaned deadline
+                    del self._updated_mono[workflow_id]
+                    continue
+                stuck.append(workflow_state)
+        return stuck
+
     async def _start_webhook_server(self):
         """Start the webhook server for receiving Playwright notifications"""
         try:
@@ -1045,7 +1591,12 @@ class OrchestratorAgent:
             runner = web.AppRunner(self.app)
             await runner.setup()
             
-            self.server = web.TCPSite(runner, '0.0.0.0', self.webhook_port)
+            # SO_REUSEPORT lets several orchestrator processes share the webhook port
+            self.server = web.TCPSite(
+                runner, '0.0.0.0', self.webhook_port,
+                reuse_port=hasattr(socket, 'SO_REUSEPORT'),
+                backlog=512
+            )
             await self.server.start()
             
             self.logger.info(f"Webhook server started on port {self.webhook_port}")
@@ -1062,7 +1613,7 @@ class OrchestratorAgent:
         """Handle incoming Playwright failure notifications"""
         try:
             # Parse payload
-            payload_data = await request.json()
+            payload_data = _json_loads(await request.read())
             self.logger.info(f"Received Playwright failure notification: {payload_data.get('test_title', 'Unknown')}")
             
             # Validate payload
@@ -1075,17 +1626,17 @@ class OrchestratorAgent:
                 status=payload_data.get('status', 'failed'),
                 error=payload_data.get('error', {}),
                 retries=payload_data.get('retries', 0),
-                trace_id=payload_data.get('trace_id', str(uuid.uuid4())),
+                trace_id=payload_data.get('trace_id') or secrets.token_hex(16),
                 video_url=payload_data.get('video_url'),
                 trace_url=payload_data.get('trace_url'),
-                timestamp=payload_data.get('timestamp', datetime.now().isoformat())
+                timestamp=payload_data.get('timestamp') or datetime.now().isoformat()
             )
             
             # Start incident response workflow
             workflow_id = await self._start_incident_workflow(failure_payload)
             
             if workflow_id:
-                return web.json_response({
+                return _json_response({
                     "status": "success",
                     "workflow_id": workflow_id,
                     "message": "Incident response workflow started"
@@ -1105,7 +1656,7 @@ class OrchestratorAgent:
         is_healthy = await self.health_check()
         status = 200 if is_healthy else 503
         
-        return web.json_response({
+        return _json_response({
             "status": "healthy" if is_healthy else "unhealthy",
             "agent_id": self.agent_id,
             "active_workflows": len(self.active_workflows),
@@ -1120,7 +1671,7 @@ class OrchestratorAgent:
         """Handle status check requests"""
         uptime_seconds = (datetime.now() - self.start_time).total_seconds()
         
-        return web.json_response({
+        return _json_response({
             "agent_id": self.agent_id,
             "status": self.status,
             "active_workflows": len(self.active_workflows),
@@ -1139,69 +1690,79 @@ class OrchestratorAgent:
         """Handle RCA analysis completion"""
         try:
             if workflow_id not in self.active_workflows:
-                self.logger.error(f"Analysis complete for unknown workflow: {workflow_id}")
+                self.logger.error("Analysis complete for unknown workflow: %s", workflow_id)
                 return
             
             workflow_state = self.active_workflows[workflow_id]
             workflow_state.analysis_result = analysis_result
-            workflow_state.updated_at = datetime.now()
+            if workflow_state.topology_task is not None:
+                # Topology was fetched alongside RCA; the proposal needs it, so wait here
+                try:
+                    await workflow_state.topology_task
+                except asyncio.CancelledError:
+                    if workflow_state.status == 'failed':
+                        return
+                    raise
+                finally:
+                    workflow_state.topology_task = None
+            now = self._touch_workflow(workflow_state)
             
             # Log analysis completion
-            await self._log_mcp_event('analysis_complete', {
+            self._log_mcp_event('analysis_complete', {
                 'workflow_id': workflow_id,
                 'classification': analysis_result.get('classification'),
                 'confidence_score': analysis_result.get('confidence_score')
-            })
+            }, ts=now)
             
             # Trigger remediation proposal
             await self._trigger_remediation_proposal(workflow_state)
             
         except Exception as e:
-            self.logger.error(f"Error handling analysis completion: {e}")
+            self.logger.error("Error handling analysis completion: %s", e)
             await self._fail_workflow(workflow_id, f"Analysis handling error: {e}")
     
     async def _handle_remediation_proposed(self, workflow_id: str, remediation_action: Dict[str, Any]):
         """Handle remediation proposal"""
         try:
             if workflow_id not in self.active_workflows:
-                self.logger.error(f"Remediation proposed for unknown workflow: {workflow_id}")
+                self.logger.error("Remediation proposed for unknown workflow: %s", workflow_id)
                 return
             
             workflow_state = self.active_workflows[workflow_id]
             workflow_state.remediation_action = remediation_action
-            workflow_state.updated_at = datetime.now()
+            now = self._touch_workflow(workflow_state)
             
             # Log remediation proposal
-            await self._log_mcp_event('remediation_proposed', {
+            self._log_mcp_event('remediation_proposed', {
                 'workflow_id': workflow_id,
                 'action_type': remediation_action.get('type'),
                 'risk_level': remediation_action.get('risk_level')
-            })
+            }, ts=now)
             
             # Trigger approval request
             await self._trigger_approval_request(workflow_state)
             
         except Exception as e:
-            self.logger.error(f"Error handling remediation proposal: {e}")
+            self.logger.error("Error handling remediation proposal: %s", e)
             await self._fail_workflow(workflow_id, f"Remediation handling error: {e}")
     
     async def _handle_approval_received(self, workflow_id: str, approval_response: Dict[str, Any]):
         """Handle approval decision"""
         try:
             if workflow_id not in self.active_workflows:
-                self.logger.error(f"Approval received for unknown workflow: {workflow_id}")
+                self.logger.error("Approval received for unknown workflow: %s", workflow_id)
                 return
             
             workflow_state = self.active_workflows[workflow_id]
             workflow_state.approval_response = approval_response
-            workflow_state.updated_at = datetime.now()
+            now = self._touch_workflow(workflow_state)
             
             # Log approval decision
-            await self._log_mcp_event('approval_received', {
+            self._log_mcp_event('approval_received', {
                 'workflow_id': workflow_id,
                 'decision': approval_response.get('decision'),
                 'user_id': approval_response.get('user_id')
-            })
+            }, ts=now)
             
             # If approved, trigger execution
             if approval_response.get('decision') == 'approve':
@@ -1213,42 +1774,44 @@ class OrchestratorAgent:
                 })
             
         except Exception as e:
-            self.logger.error(f"Error handling approval: {e}")
+            self.logger.error("Error handling approval: %s", e)
             await self._fail_workflow(workflow_id, f"Approval handling error: {e}")
     
     async def _handle_execution_complete(self, workflow_id: str, execution_result: Dict[str, Any]):
         """Handle remediation execution completion"""
         try:
             if workflow_id not in self.active_workflows:
-                self.logger.error(f"Execution complete for unknown workflow: {workflow_id}")
+                self.logger.error("Execution complete for unknown workflow: %s", workflow_id)
                 return
             
             workflow_state = self.active_workflows[workflow_id]
             workflow_state.execution_result = execution_result
-            workflow_state.updated_at = datetime.now()
+            now = self._touch_workflow(workflow_state)
             
             # Log execution completion
-            await self._log_mcp_event('execution_complete', {
+            self._log_mcp_event('execution_complete', {
                 'workflow_id': workflow_id,
                 'success': execution_result.get('success'),
                 'duration': execution_result.get('duration_seconds')
-            })
+            }, ts=now)
             
             # Complete workflow
             await self._complete_workflow(workflow_id, execution_result)
             
         except Exception as e:
-            self.logger.error(f"Error handling execution completion: {e}")
+            self.logger.error("Error handling execution completion: %s", e)
             await self._fail_workflow(workflow_id, f"Execution handling error: {e}")
     
     def _validate_failure_payload(self, payload: Dict[str, Any]) -> bool:
         """Validate Playwright failure payload"""
-        required_fields = ['test_title', 'status', 'error', 'retries', 'trace_id']
-        
-        for field in required_fields:
-            if field not in payload:
-                self.logger.error(f"Missing required field: {field}")
-                return False
+        if not isinstance(payload, dict):
+            self.logger.error("Payload must be a JSON object")
+            return False
+            
+        missing = self._REQUIRED_FIELDS - payload.keys()
+        if missing:
+            self.logger.error("Missing required fields: %s", sorted(missing))
+            return False
                 
         # Validate error structure
         if not isinstance(payload['error'], dict):
@@ -1261,8 +1824,10 @@ class OrchestratorAgent:
         """Start a new incident response workflow"""
         try:
             # Generate IDs
-            workflow_id = str(uuid.uuid4())
-            incident_id = f"inc-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{workflow_id[:8]}"
+            workflow_id = secrets.token_hex(12)
+            now = datetime.now()
+            mono = time.monotonic()
+            incident_id = f"inc-{now.strftime('%Y%m%d-%H%M%S')}-{workflow_id[:8]}"
             
             # Create workflow state
             workflow_state = WorkflowState(
@@ -1270,26 +1835,28 @@ class OrchestratorAgent:
                 incident_id=incident_id,
                 failure_payload=failure_payload,
                 status='started',
-                created_at=datetime.now(),
-                updated_at=datetime.now()
+                created_at=now,
+                updated_at=now,
+                created_mono=mono
             )
             
             # Store workflow
             self.active_workflows[workflow_id] = workflow_state
+            self._touch_workflow(workflow_state, now, mono)
             
             # Log workflow start via MCP
-            await self._log_mcp_event('workflow_started', {
+            self._log_mcp_event('workflow_started', {
                 'workflow_id': workflow_id,
                 'incident_id': incident_id,
                 'test_title': failure_payload.test_title,
                 'trace_id': failure_payload.trace_id,
                 'failure_status': failure_payload.status
-            })
+            }, ts=now)
             
             # Start A2A workflow
             workflow_context = {
                 "incident_id": incident_id,
-                "failure_payload": asdict(failure_payload),
+                "failure_payload": failure_payload.as_wire(),
                 "trace_id": failure_payload.trace_id,
                 "test_title": failure_payload.test_title
             }
@@ -1299,304 +1866,179 @@ class OrchestratorAgent:
             # Trigger RCA analysis via A2A
             await self._trigger_rca_analysis(workflow_state)
             
-            self.logger.info(f"Started incident workflow {workflow_id} for incident {incident_id}")
+            self.logger.info("Started incident workflow %s for incident %s", workflow_id, incident_id)
             return workflow_id
             
         except Exception as e:
-            self.logger.error(f"Failed to start incident workflow: {e}")
-            await self._log_mcp_event('workflow_start_failed', {
+            self.logger.error("Failed to start incident workflow: %s", e)
+            self._log_mcp_event('workflow_start_failed', {
                 'error': str(e),
                 'test_title': failure_payload.test_title,
                 'trace_id': failure_payload.trace_id
             })
             return None
 
-    async def _trigger_rca_analysis(self, workflow_state: WorkflowState):
-        """Trigger RCA analysis through A2A communication"""
+    async def _run_stage(self, workflow_state: WorkflowState, spec: StageSpec):
+        """Run one workflow stage over A2A, falling back to the stage's mock result if the call fails"""
+        ctx_token = _WORKFLOW_CTX.set((workflow_state.workflow_id, workflow_state.correlation_id))
         try:
-            if not self.rca_agents:
-                await self._fail_workflow(workflow_state.workflow_id, "No RCA agents available")
+            if not getattr(self, spec.agents_attr):
+                await self._fail_workflow(workflow_state.workflow_id, f"No {spec.agent_label} agents available")
                 return
                 
             # Update workflow status
-            workflow_state.status = 'analyzing'
-            workflow_state.updated_at = datetime.now()
-            
-            # Prepare analysis request for A2A communication
-            analysis_request = {
-                "failure_payload": {
-                    "test_title": workflow_state.failure_payload.test_title,
-                    "status": workflow_state.failure_payload.status,
-                    "error_message": workflow_state.failure_payload.error.get('message', str(workflow_state.failure_payload.error)),
-                    "error_stack": workflow_state.failure_payload.error.get('stack', ''),
-                    "error_type": workflow_state.failure_payload.error.get('type', 'Error'),
-                    "retries": workflow_state.failure_payload.retries,
-                    "trace_id": workflow_state.failure_payload.trace_id,
-                    "timestamp": workflow_state.failure_payload.timestamp
-                }
-            }
+            workflow_state.status = spec.status
+            now = self._touch_workflow(workflow_state)
             
-            # Log analysis trigger
-            await self._log_mcp_event('rca_analysis_triggered', {
+            self._log_mcp_event(spec.triggered_event, {
                 'workflow_id': workflow_state.workflow_id,
                 'incident_id': workflow_state.incident_id,
                 'trace_id': workflow_state.failure_payload.trace_id
-            })
+            }, ts=now, critical=False)
+            
+            # Topology does not depend on the RCA result, so overlap the two calls
+            if spec.prefetch_topology and self._topology_skill and workflow_state.topology_data is None:
+                workflow_state.topology_task = asyncio.create_task(self._fetch_topology(workflow_state))
             
+            handler = getattr(self, spec.handler)
             # Try A2A first, then mock fallback if A2A fails
-            correlation_id = f"wf-{workflow_state.workflow_id}"
             try:
-                rca_skill = self.services["rca"]["a2a"].get("skill", "analyze_failure")
-                analysis_result = await self._a2a_call("rca", rca_skill, analysis_request,
-                                                       timeout=45.0, correlation_id=correlation_id)
-                await self._handle_analysis_complete(workflow_state.workflow_id, analysis_result)
+                result = await self._stage_a2a_call(
+                    workflow_state, spec.service, getattr(self, spec.skill_attr), spec.build_payload(workflow_state),
+                    timeout=spec.timeout
+                )
+            except WorkflowAborted:
+                return
             except Exception as e:
-                self.logger.warning(f"RCA A2A call failed, using mock analysis: {e}")
-                await self._log_mcp_event('rca_a2a_failed_mock_fallback', {
+                self.logger.warning("%s A2A call failed, using %s: %s", spec.agent_label, spec.fallback, e)
+                self._log_mcp_event(spec.fallback_event, {
                     'workflow_id': workflow_state.workflow_id,
+                    'stage': spec.name,
                     'error': str(e)
                 })
-                mock_analysis = {
-                    'classification': 'Backend Error',
-                    'failing_service': 'unknown-service',
-                    'summary': 'A2A communication failed, using mock analysis',
-                    'confidence_score': 0.8,
-                    'evidence_count': 1
-                }
-                await self._handle_analysis_complete(workflow_state.workflow_id, mock_analysis)
+                result = spec.mock(workflow_state)
+            await handler(workflow_state.workflow_id, result)
                 
         except Exception as e:
-            self.logger.error(f"Failed to trigger RCA analysis: {e}")
-            await self._fail_workflow(workflow_state.workflow_id, f"RCA trigger error: {e}")
-            
-    async def _trigger_remediation_proposal(self, workflow_state: WorkflowState):
-        """Trigger remediation proposal through A2A communication"""
+            self.logger.error("Failed to trigger %s: %s", spec.description, e)
+            await self._fail_workflow(workflow_state.workflow_id, f"{spec.description} trigger error: {e}")
+        finally:
+            _WORKFLOW_CTX.reset(ctx_token)
+
+    async def _trigger_rca_analysis(self, workflow_state: WorkflowState):
+        """Trigger RCA analysis through A2A communication"""
+        await self._run_stage(workflow_state, _STAGES['rca'])
+
+    async def _fetch_topology(self, workflow_state: WorkflowState) -> Optional[Dict[str, Any]]:
+        """Fetch topology data for a workflow; failures are logged and leave topology_data unset"""
         try:
-            if not self.remediation_agents:
-                await self._fail_workflow(workflow_state.workflow_id, "No remediation agents available")
-                return
-                
-            # Update workflow status
-            workflow_state.status = 'proposing'
-            workflow_state.updated_at = datetime.now()
-            
-            # Send remediation request
-            remediation_request = {
-                "workflow_id": workflow_state.workflow_id,
-                "incident_id": workflow_state.incident_id,
-                "analysis_result": workflow_state.analysis_result,
-                "topology_data": workflow_state.topology_data
-            }
-            
-            # Log remediation trigger
-            await self._log_mcp_event('remediation_proposal_triggered', {
-                'workflow_id': workflow_state.workflow_id,
-                'incident_id': workflow_state.incident_id
-            })
-            
-            # Try A2A, then mock fallback
-            correlation_id = f"wf-{workflow_state.workflow_id}"
-            try:
-                propose_skill = self.services["remediation"]["a2a"].get("propose_skill", "propose_remediation")
-                propose_payload = {
-                    "workflow_id": workflow_state.workflow_id,
-                    "incident_id": workflow_state.incident_id,
-                    "analysis_result": workflow_state.analysis_result,
-                    "topology_data": workflow_state.topology_data,
-                }
-                remediation_proposal = await self._a2a_call(
-                    "remediation", propose_skill, propose_payload, timeout=60.0, correlation_id=correlation_id
-                )
-                await self._handle_remediation_proposed(workflow_state.workflow_id, remediation_proposal)
-            except Exception as e:
-                self.logger.warning(f"Remediation A2A call failed, using mock proposal: {e}")
-                await self._log_mcp_event('remediation_a2a_failed_mock_fallback', {
-                    'workflow_id': workflow_state.workflow_id,
-                    'stage': 'propose',
-                    'error': str(e)
-                })
-                mock_remediation = {
-                    'type': 'restart_service',
-                    'service': (workflow_state.analysis_result or {}).get('failing_service', 'unknown-service'),
-                    'risk_level': 'medium',
-                    'description': 'A2A communication failed, using mock remediation proposal'
-                }
-                await self._handle_remediation_proposed(workflow_state.workflow_id, mock_remediation)
-                
+            workflow_state.topology_data = await self._a2a_call(
+                Svc.TOPOLOGY, self._topology_skill, {"trace_id": workflow_state.failure_payload.trace_id},
+                timeout=45.0, correlation_id=workflow_state.correlation_id
+            )
         except Exception as e:
-            self.logger.error(f"Failed to trigger remediation proposal: {e}")
-            await self._fail_workflow(workflow_state.workflow_id, f"Remediation trigger error: {e}")
-            
+            self.logger.warning("Topology fetch failed for workflow %s: %s", workflow_state.workflow_id, e)
+        return workflow_state.topology_data
+
+    async def _trigger_remediation_proposal(self, workflow_state: WorkflowState):
+        """Trigger remediation proposal through A2A communication"""
+        await self._run_stage(workflow_state, _STAGES['propose'])
+
     async def _trigger_approval_request(self, workflow_state: WorkflowState):
         """Trigger approval request through A2A communication"""
-        try:
-            if not self.approval_agents:
-                await self._fail_workflow(workflow_state.workflow_id, "No approval agents available")
-                return
-                
-            # Update workflow status
-            workflow_state.status = 'awaiting_approval'
-            workflow_state.updated_at = datetime.now()
-            
-            # Send approval request
-            approval_request = {
-                "workflow_id": workflow_state.workflow_id,
-                "incident_id": workflow_state.incident_id,
-                "analysis_result": workflow_state.analysis_result,
-                "remediation_action": workflow_state.remediation_action,
-                "failure_payload": asdict(workflow_state.failure_payload)
-            }
-            
-            # Log approval trigger
-            await self._log_mcp_event('approval_request_triggered', {
-                'workflow_id': workflow_state.workflow_id,
-                'incident_id': workflow_state.incident_id
-            })
-            
-            # Try A2A, then mock fallback
-            correlation_id = f"wf-{workflow_state.workflow_id}"
-            try:
-                approval_skill = self.services["approval"]["a2a"].get("skill", "request_approval")
-                approval_result = await self._a2a_call("approval", approval_skill, approval_request,
-                                                       timeout=45.0, correlation_id=correlation_id)
-                await self._handle_approval_received(workflow_state.workflow_id, approval_result)
-            except Exception as e:
-                self.logger.warning(f"Approval A2A call failed, using auto-approval: {e}")
-                await self._log_mcp_event('approval_a2a_failed_mock_fallback', {
-                    'workflow_id': workflow_state.workflow_id,
-                    'error': str(e)
-                })
-                mock_approval = {
-                    'decision': 'approve',
-                    'user_id': 'system',
-                    'reason': 'A2A communication failed, auto-approved for testing'
-                }
-                await self._handle_approval_received(workflow_state.workflow_id, mock_approval)
-                
-        except Exception as e:
-            self.logger.error(f"Failed to trigger approval request: {e}")
-            await self._fail_workflow(workflow_state.workflow_id, f"Approval trigger error: {e}")
-            
+        await self._run_stage(workflow_state, _STAGES['approval'])
+
     async def _trigger_remediation_execution(self, workflow_state: WorkflowState):
         """Trigger remediation execution through A2A communication"""
-        try:
-            if not self.remediation_agents:
-                await self._fail_workflow(workflow_state.workflow_id, "No remediation agents available")
-                return
-                
-            # Update workflow status
-            workflow_state.status = 'executing'
-            workflow_state.updated_at = datetime.now()
-            
-            # Send execution request
-            execution_request = {
-                "workflow_id": workflow_state.workflow_id,
-                "incident_id": workflow_state.incident_id,
-                "remediation_action": workflow_state.remediation_action,
-                "approval_response": workflow_state.approval_response
-            }
-            
-            # Log execution trigger
-            await self._log_mcp_event('remediation_execution_triggered', {
-                'workflow_id': workflow_state.workflow_id,
-                'incident_id': workflow_state.incident_id
-            })
-            
-            # Try A2A, then mock fallback
-            correlation_id = f"wf-{workflow_state.workflow_id}"
-            try:
-                execute_skill = self.services["remediation"]["a2a"].get("execute_skill", "execute_remediation")
-                execute_payload = {
-                    "workflow_id": workflow_state.workflow_id,
-                    "incident_id": workflow_state.incident_id,
-                    "remediation_action": workflow_state.remediation_action,
-                    "approval_response": workflow_state.approval_response,
-                }
-                execution_result = await self._a2a_call(
-                    "remediation", execute_skill, execute_payload, timeout=90.0, correlation_id=correlation_id
-                )
-                await self._handle_execution_complete(workflow_state.workflow_id, execution_result)
-            except Exception as e:
-                self.logger.warning(f"Remediation A2A call failed, using mock execution: {e}")
-                await self._log_mcp_event('remediation_a2a_failed_mock_fallback', {
-                    'workflow_id': workflow_state.workflow_id,
-                    'stage': 'execute',
-                    'error': str(e)
-                })
-                mock_execution = {
-                    'success': True,
-                    'duration_seconds': 30,
-                    'actions_taken': ['A2A communication failed, mock service restart'],
-                    'verification_status': 'passed'
-                }
-                await self._handle_execution_complete(workflow_state.workflow_id, mock_execution)
-                
-        except Exception as e:
-            self.logger.error(f"Failed to trigger remediation execution: {e}")
-            await self._fail_workflow(workflow_state.workflow_id, f"Execution trigger error: {e}")
-            
+        await self._run_stage(workflow_state, _STAGES['execute'])
+
     async def _complete_workflow(self, workflow_id: str, result: Dict[str, Any]):
         """Complete a workflow successfully"""
         try:
             if workflow_id not in self.active_workflows:
-                self.logger.error(f"Cannot complete unknown workflow: {workflow_id}")
+                self.logger.error("Cannot complete unknown workflow: %s", workflow_id)
                 return
                 
             workflow_state = self.active_workflows[workflow_id]
             workflow_state.status = 'completed'
-            workflow_state.updated_at = datetime.now()
+            now = self._touch_workflow(workflow_state)
             workflow_state.execution_result = result
             
             # Complete A2A workflow
             await self.complete_workflow(workflow_id, result)
             
             # Log completion
-            await self._log_mcp_event('workflow_completed', {
+            self._log_mcp_event('workflow_completed', {
                 'workflow_id': workflow_id,
                 'incident_id': workflow_state.incident_id,
-                'duration_seconds': (workflow_state.updated_at - workflow_state.created_at).total_seconds(),
+                'duration_seconds': workflow_state.updated_mono - workflow_state.created_mono,
                 'result': result
-            })
+            }, ts=now)
             
             # Remove from active workflows after a delay (for status queries)
-            asyncio.create_task(self._cleanup_completed_workflow(workflow_id))
+            self._schedule_workflow_cleanup(workflow_id, workflow_state.updated_mono)
             
         except Exception as e:
-            self.logger.error(f"Error completing workflow {workflow_id}: {e}")
-            
-    async def _cleanup_completed_workflow(self, workflow_id: str):
-        """Clean up completed workflow after delay"""
-        await asyncio.sleep(300)  # 5 minute delay
-        if workflow_id in self.active_workflows:
-            del self.active_workflows[workflow_id]
+            self.logger.error("Error completing workflow %s: %s", workflow_id, e)
+            
+    def _schedule_workflow_cleanup(self, workflow_id: str, finished_mono: Optional[float] = None):
+        """Queue a finished workflow for removal once its retention period has passed"""
+        if finished_mono is None:
+            finished_mono = time.monotonic()
+        if not self._cleanup_heap:
+            self._cleanup_added.set()
+        heapq.heappush(self._cleanup_heap, (finished_mono + self.finished_workflow_ttl, workflow_id))
+
+    async def _workflow_janitor(self):
+        """Drop finished workflows from active_workflows as their retention periods expire"""
+        while True:
+            now = time.monotonic()
+            while self._cleanup_heap and self._cleanup_heap[0][0] <= now:
+                _, workflow_id = heapq.heappop(self._cleanup_heap)
+                self.active_workflows.pop(workflow_id, None)
+                self._updated_mono.pop(workflow_id, None)
+            
+            # Sleep until the next expiry, or until the first entry is queued
+            delay = self._cleanup_heap[0][0] - now if self._cleanup_heap else None
+            self._cleanup_added.clear()
+            try:
+                await asyncio.wait_for(self._cleanup_added.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
             
     async def _fail_workflow(self, workflow_id: str, error_message: str):
         """Fail a workflow with error message"""
         try:
             if workflow_id not in self.active_workflows:
-                self.logger.error(f"Cannot fail unknown workflow: {workflow_id}")
+                self.logger.error("Cannot fail unknown workflow: %s", workflow_id)
                 return
                 
             workflow_state = self.active_workflows[workflow_id]
             workflow_state.status = 'failed'
-            workflow_state.updated_at = datetime.now()
+            now = self._touch_workflow(workflow_state)
             workflow_state.error_message = error_message
             
+            # Stop any A2A call still running for this workflow
+            if workflow_state.inflight and not workflow_state.inflight.done():
+                workflow_state.inflight.cancel()
+            if workflow_state.topology_task and not workflow_state.topology_task.done():
+                workflow_state.topology_task.cancel()
+            
             # Log failure
-            await self._log_mcp_event('workflow_failed', {
+            self._log_mcp_event('workflow_failed', {
                 'workflow_id': workflow_id,
                 'incident_id': workflow_state.incident_id,
                 'error_message': error_message,
-                'duration_seconds': (workflow_state.updated_at - workflow_state.created_at).total_seconds()
-            })
+                'duration_seconds': workflow_state.updated_mono - workflow_state.created_mono
+            }, ts=now)
             
-            self.logger.error(f"Workflow {workflow_id} failed: {error_message}")
+            self.logger.error("Workflow %s failed: %s", workflow_id, error_message)
             
             # Remove from active workflows after a delay
-            asyncio.create_task(self._cleanup_completed_workflow(workflow_id))
+            self._schedule_workflow_cleanup(workflow_id, workflow_state.updated_mono)
             
         except Exception as e:
-            self.logger.error(f"Error failing workflow {workflow_id}: {e}")
+            self.logger.error("Error failing workflow %s: %s", workflow_id, e)
             
     async def _discover_agents(self):
         """Discover available agents for coordination"""
@@ -1614,24 +2056,31 @@ class OrchestratorAgent:
             self.logger.error(f"Agent discovery failed: {e}")
             
     async def _monitor_workflows(self):
-        """Monitor active workflows for timeouts and errors"""
+        """Monitor active workflows for timeouts, waking at the earliest pending deadline"""
         while self.running:
             try:
                 current_time = datetime.now()
+                mono_now = time.monotonic()
                 
-                # Check for stuck workflows
-                for workflow_id, workflow_state in list(self.active_workflows.items()):
-                    time_since_update = current_time - workflow_state.updated_at
-                    
-                    if time_since_update > self.workflow_timeout:
-                        self.logger.warning(f"Workflow {workflow_id} timed out")
-                        await self._fail_workflow(workflow_id, "Workflow timeout")
+                # Fail workflows whose deadline has passed
+                timed_out = [w.workflow_id for w in self._pop_stuck_workflows(mono_now)]
+                if timed_out:
+                    self.logger.warning(f"Workflows timed out: {timed_out}")
+                    await self._fail_workflows(timed_out, "Workflow timeout")
                 
                 # Update heartbeat
                 self.last_heartbeat = current_time
                 
-                # Sleep for monitoring interval
-                await asyncio.sleep(30)  # Check every 30 seconds
+                # Sleep until the next deadline (or a first one is added), at most 30 seconds for the heartbeat
+                delay = 30.0
+                if self._workflow_deadlines:
+                    next_deadline = self._workflow_deadlines[0][0] + self.workflow_timeout.total_seconds()
+                    delay = min(delay, max(next_deadline - mono_now, 0.01))
+                self._deadlines_added.clear()
+                try:
+                    await asyncio.wait_for(self._deadlines_added.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
                 
             except Exception as e:
                 self.logger.error(f"Error in workflow monitoring: {e}")
@@ -7,9 +7,14 @@ or systems using the A2A protocol.
 
 import asyncio
 import json
+import hashlib
+import importlib.util
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Final, List, Optional, Union
 from datetime import datetime
+from types import MappingProxyType
 
 from a2a.types import AgentCard, AgentCapabilities, AgentSkill, AgentProvider
 from a2a.server.agent_execution import AgentExecutor, RequestContext, SimpleRequestContextBuilder
@@ -17,23 +22,130 @@ from a2a.server.tasks import TaskStore, InMemoryTaskStore
 from a2a.server.events import QueueManager, InMemoryQueueManager
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.apps import A2AFastAPIApplication
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+
+# orjson-backed responses when available; FastAPI's stdlib json otherwise
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as _JSONResponse
+    ORJSON_AVAILABLE = True
+except ImportError:
+    from fastapi.responses import JSONResponse as _JSONResponse
+    ORJSON_AVAILABLE = False
+
+try:
+    from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+except ImportError:
+    AGENT_CARD_WELL_KNOWN_PATH = "/.well-known/agent.json"
 
 # Disable ADK before importing RCA agent to avoid validation issues
 import agents.rca_agent as rca_module
 rca_module.ADK_AVAILABLE = False
 
-from .rca_agent import RCAAgent, AgentConfig, FailurePayload, AnalysisResult, ErrorDetails
+from .rca_agent import RCAAgent, AgentConfig, AnalysisResult
 
 logger = logging.getLogger(__name__)
 
+# Fields every analysis response carries, filled in when the RCA agent leaves them out
+_DEFAULT_RESULT = MappingProxyType({
+    "classification": "Unknown",
+    "failing_service": None,
+    "summary": "No summary",
+    "confidence_score": 0.0,
+    "evidence_count": 0,
+    "analysis_duration": 0.0,
+    "evidence": ()
+})
+
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON with orjson when available; both raise json.JSONDecodeError subclasses"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_bytes(data: Any) -> bytes:
+    """Encode JSON to bytes with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data)
+    return json.dumps(data).encode()
+
+
+# Pre-encoded body for requests without a failure_payload
+_EMPTY_PAYLOAD_ERROR_BYTES = _json_bytes({
+    "error": "Missing failure_payload in request",
+    "status": "error"
+})
+
+_INVALID_JSON_ERROR_BYTES = _json_bytes({
+    "error": "Invalid JSON in request body",
+    "status": "error"
+})
+
+
+def _error_body(error: str) -> Dict[str, Any]:
+    """Analysis error response in the same shape as a successful result"""
+    return {**_DEFAULT_RESULT, "status": "error", "error": error, "summary": f"Analysis failed: {error}"}
+
+
+# Pre-encoded /analyze error bodies for exception types whose message adds nothing per request
+_ERROR_RESPONSES: Final[Dict[type, bytes]] = {
+    asyncio.TimeoutError: _json_bytes(_error_body("Analysis timed out")),
+    MemoryError: _json_bytes(_error_body("Out of memory")),
+}
+
+# Responses with more evidence items than this are encoded off the event loop,
+# and past the streaming threshold sent as chunks of evidence items instead
+_OFFLOAD_EVIDENCE_THRESHOLD = 32
+_STREAM_EVIDENCE_THRESHOLD = 256
+_STREAM_CHUNK_ITEMS = 64
+
+
+async def _stream_result(result: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """Yield a result as JSON with its evidence array encoded a chunk of items at a time"""
+    head = _json_bytes({k: v for k, v in result.items() if k != "evidence"})
+    yield head[:-1] + b',"evidence":['
+    evidence = result["evidence"]
+    for start in range(0, len(evidence), _STREAM_CHUNK_ITEMS):
+        chunk = b",".join(_json_bytes(item) for item in evidence[start:start + _STREAM_CHUNK_ITEMS])
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]}"
+
+
+async def _stream_analysis_events(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Yield analyze_failure_stream events as newline-delimited JSON, completing the final result"""
+    async for event in events:
+        if not event.get("partial"):
+            event = {**_DEFAULT_RESULT, **event, "status": "completed"}
+        yield _json_bytes(event) + b"\n"
+
+
+def _result_cache_key(failure_data: Dict[str, Any]) -> str:
+    """Hash the parts of a failure that identify a repeat of the same flaky test failure"""
+    key = "\0".join((
+        failure_data.get("error_type", "Error"),
+        failure_data.get("test_title", ""),
+        failure_data.get("error_message", "").strip()[:512]
+    ))
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
 
 class RCAAgentExecutor(AgentExecutor):
     """
     A2A AgentExecutor implementation that wraps the RCA agent
     """
 
-    def __init__(self, rca_agent: RCAAgent):
+    def __init__(self, rca_agent: RCAAgent, cache_ttl: float = 0.0, cache_size: int = 256):
         self.rca_agent = rca_agent
+        # Recent analysis results by _result_cache_key, as (monotonic time, result); cache_ttl 0 disables
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._cache: Dict[str, tuple] = {}
+        # Running analyses by task_id, so cancel() can stop them
+        self._tasks: Dict[str, asyncio.Task] = {}
         logger.info("RCA AgentExecutor initialized")
 
     async def execute(self, task_id: str, request: Dict[str, Any], context: Optional[RequestContext] = None) -> Dict[str, Any]:
@@ -49,58 +161,55 @@ class RCAAgentExecutor(AgentExecutor):
             Analysis result
         """
         try:
-            logger.info(f"Executing RCA task {task_id}")
+            logger.info("Executing RCA task %s", task_id)
 
             # Extract failure payload from request
             failure_data = request.get("failure_payload", {})
             if not failure_data:
                 raise ValueError("Missing failure_payload in request")
 
-            # Convert to FailurePayload
-            payload = FailurePayload(
-                test_title=failure_data.get("test_title", "Unknown Test"),
-                status=failure_data.get("status", "failed"),
-                error=ErrorDetails(
-                    message=failure_data.get("error_message", "Unknown error"),
-                    stack=failure_data.get("error_stack", ""),
-                    type=failure_data.get("error_type", "Error")
-                ),
-                retries=failure_data.get("retries", 0),
-                trace_id=failure_data.get("trace_id", f"trace-{task_id}"),
-                timestamp=failure_data.get("timestamp")
-            )
-
-            # Execute RCA analysis (pass dict directly)
-            analysis_result = await self.rca_agent.analyze_failure(failure_data)
-
-            # Convert result to dict (analysis_result is already a dict)
-            result = {
-                "task_id": task_id,
-                "classification": analysis_result.get("classification", "Unknown"),
-                "failing_service": analysis_result.get("failing_service"),
-                "summary": analysis_result.get("summary", "No summary"),
-                "confidence_score": analysis_result.get("confidence_score", 0.0),
-                "evidence_count": analysis_result.get("evidence_count", 0),
-                "analysis_duration": analysis_result.get("analysis_duration", 0.0),
-                "trace_id": analysis_result.get("trace_id", f"trace-{task_id}"),
-                "evidence": analysis_result.get("evidence", [])
-            }
-
-            logger.info(f"RCA task {task_id} completed: {result['classification']}")
+            # Reuse a recent analysis of the same failure instead of running it again
+            key = _result_cache_key(failure_data) if self.cache_ttl > 0 else None
+            cached = self._cache.get(key) if key else None
+            if cached and time.monotonic() - cached[0] < self.cache_ttl:
+                # The conclusion is reused; evidence belongs to the earlier trace, which is named instead
+                result = {**_DEFAULT_RESULT, **cached[1], "task_id": task_id, "cached": True,
+                          "cached_from_trace_id": cached[1].get("trace_id"),
+                          "evidence": _DEFAULT_RESULT["evidence"], "evidence_count": 0}
+                result["trace_id"] = failure_data.get("trace_id", f"trace-{task_id}")
+                logger.info("RCA task %s served from cache: %s", task_id, result['classification'])
+                return result
+
+            # Execute RCA analysis (pass dict directly) as a child task that cancel() can stop
+            analysis = asyncio.ensure_future(self.rca_agent.analyze_failure(failure_data))
+            self._tasks[task_id] = analysis
+            try:
+                analysis_result = await analysis
+            except asyncio.CancelledError:
+                if analysis.cancelled() and not asyncio.current_task().cancelling():
+                    logger.info("RCA task %s cancelled", task_id)
+                    return {**_DEFAULT_RESULT, "task_id": task_id, "status": "cancelled",
+                            "summary": "Analysis cancelled"}
+                raise
+            finally:
+                self._tasks.pop(task_id, None)
+            result = {**_DEFAULT_RESULT, **analysis_result, "task_id": task_id}
+            if "trace_id" not in result:
+                result["trace_id"] = f"trace-{task_id}"
+
+            # Only cache real analyses, not the agent's zero-confidence failure result
+            if key and result["confidence_score"]:
+                self._cache.pop(key, None)
+                self._cache[key] = (time.monotonic(), analysis_result)
+                if len(self._cache) > self.cache_size:
+                    del self._cache[next(iter(self._cache))]
+
+            logger.info("RCA task %s completed: %s", task_id, result['classification'])
             return result
 
         except Exception as e:
-            logger.error(f"RCA task {task_id} failed: {e}")
-            return {
-                "task_id": task_id,
-                "error": str(e),
-                "classification": "Unknown",
-                "failing_service": None,
-                "summary": f"Analysis failed: {str(e)}",
-                "confidence_score": 0.0,
-                "evidence_count": 0,
-                "evidence": []
-            }
+            logger.error("RCA task %s failed: %s", task_id, e)
+            return {**_error_body(str(e)), "task_id": task_id}
     
     async def cancel(self, task_id: str) -> None:
         """
@@ -109,15 +218,123 @@ class RCAAgentExecutor(AgentExecutor):
         Args:
             task_id: Unique task identifier to cancel
         """
-        logger.info(f"Cancelling RCA task {task_id}")
-        # For now, just log the cancellation
-        # In a real implementation, you might cancel the actual analysis task
+        logger.info("Cancelling RCA task %s", task_id)
+        analysis = self._tasks.get(task_id)
+        if analysis is not None:
+            analysis.cancel()
+
+
+class BoundedTaskStore(InMemoryTaskStore):
+    """InMemoryTaskStore that evicts the least recently used tasks once max_tasks is exceeded"""
+
+    def __init__(self, max_tasks: int):
+        super().__init__()
+        self.max_tasks = max_tasks
+        self.tasks = OrderedDict(self.tasks)
+
+    async def save(self, task, *args, **kwargs):
+        await super().save(task, *args, **kwargs)
+        if task.id in self.tasks:
+            self.tasks.move_to_end(task.id)
+        while len(self.tasks) > self.max_tasks:
+            self.tasks.popitem(last=False)
+
+    async def get(self, task_id: str, *args, **kwargs):
+        task = await super().get(task_id, *args, **kwargs)
+        if task is not None and task_id in self.tasks:
+            self.tasks.move_to_end(task_id)
+        return task
+
+
+# Skill schemas for the agent card, built once at import
+_ANALYZE_INPUT_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "failure_payload": {
+            "type": "object",
+            "properties": {
+                "test_title": {"type": "string"},
+                "status": {"type": "string"},
+                "error_message": {"type": "string"},
+                "error_stack": {"type": "string"},
+                "error_type": {"type": "string"},
+                "retries": {"type": "integer"},
+                "trace_id": {"type": "string"},
+                "timestamp": {"type": "string"}
+            },
+            "required": ["test_title", "error_message", "trace_id"]
+        }
+    },
+    "required": ["failure_payload"]
+}
+
+_ANALYZE_OUTPUT_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "task_id": {"type": "string"},
+        "classification": {"type": "string"},
+        "failing_service": {"type": ["string", "null"]},
+        "summary": {"type": "string"},
+        "confidence_score": {"type": "number"},
+        "evidence_count": {"type": "integer"},
+        "analysis_duration": {"type": "number"},
+        "trace_id": {"type": "string"},
+        "evidence": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string"},
+                    "source": {"type": "string"},
+                    "content": {"type": "string"},
+                    "severity": {"type": "string"},
+                    "service_name": {"type": ["string", "null"]},
+                    "timestamp": {"type": "string"}
+                }
+            }
+        }
+    }
+}
+
+_TOPOLOGY_INPUT_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {}
+}
+
+_TOPOLOGY_OUTPUT_SCHEMA: Final[Dict[str, Any]] = {
+    "type": "object",
+    "properties": {
+        "service_count": {"type": "integer"},
+        "entry_points": {"type": "array", "items": {"type": "string"}},
+        "critical_services": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "criticality_score": {"type": "number"}
+                }
+            }
+        },
+        "failure_patterns": {
+            "type": "object",
+            "properties": {
+                "total_failures_analyzed": {"type": "integer"},
+                "common_error_types": {"type": "array"},
+                "frequently_failing_services": {"type": "array"}
+            }
+        }
+    }
+}
 
 
-def create_rca_agent_card() -> AgentCard:
+def create_rca_agent_card(url: str) -> AgentCard:
     """
     Create the AgentCard for the RCA agent service
 
+    Args:
+        url: Base URL the service is reachable at
+
     Returns:
         AgentCard describing the RCA agent's capabilities
     """
@@ -140,53 +357,8 @@ def create_rca_agent_card() -> AgentCard:
                 tags=["rca", "analysis", "microservices"],
                 input_modes=["json-rpc"],
                 output_modes=["json-rpc"],
-                input_schema={
-                    "type": "object",
-                    "properties": {
-                        "failure_payload": {
-                            "type": "object",
-                            "properties": {
-                                "test_title": {"type": "string"},
-                                "status": {"type": "string"},
-                                "error_message": {"type": "string"},
-                                "error_stack": {"type": "string"},
-                                "error_type": {"type": "string"},
-                                "retries": {"type": "integer"},
-                                "trace_id": {"type": "string"},
-                                "timestamp": {"type": "string"}
-                            },
-                            "required": ["test_title", "error_message", "trace_id"]
-                        }
-                    },
-                    "required": ["failure_payload"]
-                },
-                output_schema={
-                    "type": "object",
-                    "properties": {
-                        "task_id": {"type": "string"},
-                        "classification": {"type": "string"},
-                        "failing_service": {"type": ["string", "null"]},
-                        "summary": {"type": "string"},
-                        "confidence_score": {"type": "number"},
-                        "evidence_count": {"type": "integer"},
-                        "analysis_duration": {"type": "number"},
-                        "trace_id": {"type": "string"},
-                        "evidence": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "type": {"type": "string"},
-                                    "source": {"type": "string"},
-                                    "content": {"type": "string"},
-                                    "severity": {"type": "string"},
-                                    "service_name": {"type": ["string", "null"]},
-                                    "timestamp": {"type": "string"}
-                                }
-                            }
-                        }
-                    }
-                }
+                input_schema=_ANALYZE_INPUT_SCHEMA,
+                output_schema=_ANALYZE_OUTPUT_SCHEMA
             ),
             AgentSkill(
                 id="get_topology_insights_skill",
@@ -195,41 +367,14 @@ def create_rca_agent_card() -> AgentCard:
                 tags=["topology", "insights", "microservices"],
                 input_modes=["json-rpc"],
                 output_modes=["json-rpc"],
-                input_schema={
-                    "type": "object",
-                    "properties": {}
-                },
-                output_schema={
-                    "type": "object",
-                    "properties": {
-                        "service_count": {"type": "integer"},
-                        "entry_points": {"type": "array", "items": {"type": "string"}},
-                        "critical_services": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "name": {"type": "string"},
-                                    "criticality_score": {"type": "number"}
-                                }
-                            }
-                        },
-                        "failure_patterns": {
-                            "type": "object",
-                            "properties": {
-                                "total_failures_analyzed": {"type": "integer"},
-                                "common_error_types": {"type": "array"},
-                                "frequently_failing_services": {"type": "array"}
-                            }
-                        }
-                    }
-                }
+                input_schema=_TOPOLOGY_INPUT_SCHEMA,
+                output_schema=_TOPOLOGY_OUTPUT_SCHEMA
             )
         ],
         preferred_transport="http",
         default_input_modes=["json-rpc"],
         default_output_modes=["json-rpc"],
-        url="http://localhost:8001",  # Default URL, can be overridden
+        url=url,
         documentation_url="https://github.com/abhitalluri/selfhealgke/blob/main/agents/README.md"
     )
 
@@ -249,9 +394,14 @@ class RCAA2AService:
         self.rca_agent = RCAAgent(agent_config.agent_id)
 
         # Create A2A components
-        self.agent_card = create_rca_agent_card()
-        self.agent_executor = RCAAgentExecutor(self.rca_agent)
-        self.task_store = InMemoryTaskStore()
+        self.agent_card = create_rca_agent_card(f"http://{host}:{port}")
+        self._agent_card_bytes = self._encode_agent_card()
+        self.agent_executor = RCAAgentExecutor(
+            self.rca_agent, cache_ttl=agent_config.metadata.get("rca_result_cache_ttl", 0.0)
+        )
+        self.task_store = BoundedTaskStore(
+            agent_config.metadata.get("task_store_max", agent_config.max_concurrent_tasks * 100)
+        )
         self.queue_manager = InMemoryQueueManager()
         self.context_builder = SimpleRequestContextBuilder()
 
@@ -267,15 +417,23 @@ class RCAA2AService:
         self.app = A2AFastAPIApplication(
             agent_card=self.agent_card,
             http_handler=self.request_handler
-        ).build()
-
-        # Add a simple REST endpoint for direct calls
-        from fastapi import FastAPI
-        if hasattr(self.app, 'add_api_route'):
-            self.app.add_api_route("/analyze", self.analyze_failure_rest, methods=["POST"])
-            logger.info("Added REST endpoint /analyze for direct RCA calls")
-
-        logger.info(f"RCA A2A Service initialized on {host}:{port}")
+        ).build(default_response_class=_JSONResponse)
+
+        # Add the cached agent card and a simple REST endpoint for direct calls
+        if isinstance(self.app, FastAPI):
+            # add_api_route appends the new route last; move it first so it shadows the SDK's own card route
+            self.app.add_api_route(AGENT_CARD_WELL_KNOWN_PATH, self.get_agent_card, methods=["GET"],
+                                   include_in_schema=False)
+            routes = self.app.router.routes
+            routes.insert(0, routes.pop())
+            # response_model=None: the endpoint returns either a dict or a pre-built Response
+            self.app.add_api_route("/analyze", self.analyze_failure_rest, methods=["POST"],
+                                   response_class=_JSONResponse, response_model=None)
+            self.app.add_api_route("/analyze/stream", self.analyze_failure_stream_rest, methods=["POST"],
+                                   response_model=None)
+            logger.info("Added REST endpoints /analyze and /analyze/stream for direct RCA calls")
+
+        logger.info("RCA A2A Service initialized on %s:%s", host, port)
 
     async def initialize(self):
         """Initialize the RCA agent and A2A service"""
@@ -286,18 +444,22 @@ class RCAA2AService:
         """Start the A2A service"""
         import uvicorn
 
-        # Update agent card URL
-        self.agent_card.url = f"http://{self.host}:{self.port}"
+        logger.info("Starting RCA A2A Service on %s:%s", self.host, self.port)
 
-        logger.info(f"Starting RCA A2A Service on {self.host}:{self.port}")
-
-        # Start the FastAPI server
+        # Start the FastAPI server; httptools parses HTTP in C when installed. serve() runs on the
+        # caller's already-running loop, so uvloop comes from running this service under uvloop.run
+        # (see __main__) rather than from uvicorn's loop setting
         config = uvicorn.Config(
             self.app,
             host=self.host,
             port=self.port,
-            log_level="info"
+            log_level="info",
+            http="httptools" if importlib.util.find_spec("httptools") else "h11"
         )
+        # Deliberately a single process: A2A tasks (BoundedTaskStore), the result cache and the
+        # cancellable analyses live in this process, so a second uvicorn worker would answer task
+        # lookups and cancels without them. To scale across cores, externalize the task store first,
+        # or run several single-worker replicas behind a load balancer with session affinity.
         server = uvicorn.Server(config)
 
         try:
@@ -307,71 +469,85 @@ class RCAA2AService:
         finally:
             await self.rca_agent.cleanup()
 
-    async def analyze_failure_rest(self, request: dict) -> Dict[str, Any]:
+    def _encode_agent_card(self) -> bytes:
+        """Encode the agent card to JSON bytes the way the A2A SDK serves it"""
+        return _json_bytes(self.agent_card.model_dump(mode="json", exclude_none=True, by_alias=True))
+
+    async def get_agent_card(self) -> Response:
+        """Serve the cached agent card"""
+        return Response(content=self._agent_card_bytes, media_type="application/json")
+
+    async def analyze_failure_rest(self, request: Request) -> Union[Dict[str, Any], Response]:
         """
         REST endpoint for direct RCA analysis calls
         
         Args:
-            request: Request containing failure_payload
+            request: Raw request whose JSON body contains failure_payload; parsed once here
+                rather than by FastAPI's body validation
             
         Returns:
             Analysis result
         """
+        failure_payload = await self._read_failure_payload(request)
+        if isinstance(failure_payload, Response):
+            return failure_payload
+
         try:
             logger.info("Received REST analysis request")
             
-            failure_payload = request.get("failure_payload", {})
-            if not failure_payload:
-                return {
-                    "error": "Missing failure_payload in request",
-                    "status": "error"
-                }
-            
-            # Convert to FailurePayload
-            payload = FailurePayload(
-                test_title=failure_payload.get("test_title", "Unknown Test"),
-                status=failure_payload.get("status", "failed"),
-                error=ErrorDetails(
-                    message=failure_payload.get("error_message", "Unknown error"),
-                    stack=failure_payload.get("error_stack", ""),
-                    type=failure_payload.get("error_type", "Error")
-                ),
-                retries=failure_payload.get("retries", 0),
-                trace_id=failure_payload.get("trace_id", f"trace-{asyncio.get_event_loop().time()}"),
-                timestamp=failure_payload.get("timestamp")
-            )
-            
             # Execute RCA analysis (pass dict directly)
             analysis_result = await self.rca_agent.analyze_failure(failure_payload)
+            result = {**_DEFAULT_RESULT, **analysis_result, "status": "completed"}
+            if "trace_id" not in result:
+                result["trace_id"] = f"trace-{asyncio.get_running_loop().time()}"
             
-            # Convert result to dict (analysis_result is already a dict)
-            result = {
-                "status": "completed",
-                "classification": analysis_result.get("classification", "Unknown"),
-                "failing_service": analysis_result.get("failing_service"),
-                "summary": analysis_result.get("summary", "No summary"),
-                "confidence_score": analysis_result.get("confidence_score", 0.0),
-                "evidence_count": analysis_result.get("evidence_count", 0),
-                "analysis_duration": analysis_result.get("analysis_duration", 0.0),
-                "trace_id": analysis_result.get("trace_id", f"trace-{asyncio.get_event_loop().time()}"),
-                "evidence": analysis_result.get("evidence", [])
-            }
-            
-            logger.info(f"REST RCA analysis completed: {result['classification']}")
+            logger.info("REST RCA analysis completed: %s", result['classification'])
+            if len(result["evidence"]) > _STREAM_EVIDENCE_THRESHOLD:
+                return StreamingResponse(_stream_result(result), media_type="application/json")
+            if ORJSON_AVAILABLE and len(result["evidence"]) > _OFFLOAD_EVIDENCE_THRESHOLD:
+                # Encode off-loop; the loop regains the GIL each switch interval rather than waiting out the encode
+                body = await asyncio.to_thread(orjson.dumps, result)
+                return Response(content=body, media_type="application/json")
             return result
             
         except Exception as e:
-            logger.error(f"REST RCA analysis failed: {e}")
-            return {
-                "status": "error",
-                "error": str(e),
-                "classification": "Unknown",
-                "failing_service": None,
-                "summary": f"Analysis failed: {str(e)}",
-                "confidence_score": 0.0,
-                "evidence_count": 0,
-                "evidence": []
-            }
+            logger.error("REST RCA analysis failed: %s", e)
+            body = _ERROR_RESPONSES.get(type(e))
+            if body is None:
+                body = _json_bytes(_error_body(str(e)))
+            return Response(content=body, media_type="application/json", status_code=500)
+
+    async def analyze_failure_stream_rest(self, request: Request) -> Response:
+        """
+        Streaming REST endpoint for direct RCA analysis calls
+
+        Args:
+            request: Raw request whose JSON body contains failure_payload
+
+        Returns:
+            Newline-delimited JSON: a partial event with the classification as soon as Gemini
+            emits it, then the completed analysis result
+        """
+        failure_payload = await self._read_failure_payload(request)
+        if isinstance(failure_payload, Response):
+            return failure_payload
+
+        logger.info("Received streaming REST analysis request")
+        return StreamingResponse(
+            _stream_analysis_events(self.rca_agent.analyze_failure_stream(failure_payload)),
+            media_type="application/x-ndjson"
+        )
+
+    async def _read_failure_payload(self, request: Request) -> Union[Dict[str, Any], Response]:
+        """Parse failure_payload from a raw request body, or build the 400 response for a bad one"""
+        try:
+            data = _json_loads(await request.body())
+        except json.JSONDecodeError:
+            return Response(content=_INVALID_JSON_ERROR_BYTES, media_type="application/json", status_code=400)
+        failure_payload = data.get("failure_payload") if isinstance(data, dict) else None
+        if not failure_payload:
+            return Response(content=_EMPTY_PAYLOAD_ERROR_BYTES, media_type="application/json", status_code=400)
+        return failure_payload
 
     async def get_topology_insights_a2a(self) -> Dict[str, Any]:
         """
@@ -402,7 +578,7 @@ async def create_rca_a2a_service(
         Configured RCA A2A service
     """
     if agent_id is None:
-        agent_id = f"rca_a2a_{int(asyncio.get_event_loop().time())}"
+        agent_id = f"rca_a2a_{int(asyncio.get_running_loop().time())}"
 
     if metadata is None:
         metadata = {}
@@ -411,6 +587,7 @@ async def create_rca_a2a_service(
     metadata.setdefault("telemetry_window_seconds", 300)
     metadata.setdefault("confidence_threshold", 0.7)
     metadata.setdefault("topology_cache_ttl", 3600)
+    metadata.setdefault("rca_result_cache_ttl", 0)
 
     config = AgentConfig(
         agent_id=agent_id,
@@ -440,4 +617,13 @@ if __name__ == "__main__":
         service = await create_rca_a2a_service()
         await service.start()
 
-    asyncio.run(main())
\ No newline at end of file
+    # Use uvloop's faster event loop when available
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
\ No newline at end of file
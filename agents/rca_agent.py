@@ -6,48 +6,117 @@ correlates with backend telemetry via MCP, and communicates via A2A.
 """
 
 import asyncio
+import heapq
+import importlib.util
 import json
 import logging
 import uuid
 import os
+import re
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Any, AsyncIterator, Set, Tuple, Union
+from dataclasses import dataclass, asdict, field
 from enum import Enum
+from types import MappingProxyType
 
 from dotenv import load_dotenv
 load_dotenv()
 
-# ADK imports - with fallback
-try:
-    from google.adk.agents import LlmAgent
-    from google.adk.models import Gemini
-    from google.adk.tools import FunctionTool
-    from google.adk import Runner
-    ADK_AVAILABLE = True
-except ImportError:
-    ADK_AVAILABLE = False
-    LlmAgent = object
-    Gemini = object
-    FunctionTool = object
-    Runner = object
 
-# Direct Gemini import for fallback
+def _module_available(name: str) -> bool:
+    """Check whether a module can be imported without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ImportError:
+        return False
+
+
+# ADK and the Gemini SDK pull in grpc/protobuf/auth, so they are only located here and
+# imported on first use (RCAAgent construction / tool creation)
+ADK_AVAILABLE = _module_available('google.adk')
+GENAI_AVAILABLE = _module_available('google.generativeai')
+
+# orjson for telemetry payloads and Gemini responses when available; stdlib json otherwise
 try:
-    import google.generativeai as genai
-    GENAI_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    GENAI_AVAILABLE = False
-
-# A2A imports
-from a2a.client import Client, ClientConfig
-from a2a.types import Message, TextPart, Role
+    ORJSON_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 logger = logging.getLogger(__name__)
 
 
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Decode JSON with orjson when available; both raise ValueError subclasses"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(data: Any) -> str:
+    """Encode JSON to str with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data).decode()
+    return json.dumps(data)
+
+
+# Gemini structured output schema matching the RESPONSE FORMAT block of the analysis prompt
+_ANALYSIS_RESPONSE_SCHEMA: Dict[str, Any] = {
+    "type": "OBJECT",
+    "properties": {
+        "trace_id": {"type": "STRING"},
+        "classification": {"type": "STRING", "enum": ["Backend Error", "UI Brittleness"]},
+        "failing_service": {"type": "STRING", "nullable": True},
+        "summary": {"type": "STRING"},
+        "confidence_score": {"type": "NUMBER"},
+        "reasoning": {"type": "STRING"},
+    },
+    "required": ["classification", "failing_service", "summary", "confidence_score", "reasoning"],
+}
+
+# First complete "classification" field in a partially streamed JSON response
+_PARTIAL_CLASSIFICATION_RE = re.compile(r'"classification"\s*:\s*"([^"]*)"')
+
+# First-to-last brace/bracket span, for JSON wrapped in markdown fences or prose
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# Plain-text fallback extraction when a Gemini response is not JSON; matched against lowercased text
+_SERVICE_TEXT_RE = re.compile(r'(?:failing service|service)[:\s]+([a-z\-_]+)')
+_CONFIDENCE_TEXT_RE = re.compile(r'confidence[:\s]+([0-9.]+)')
+
+# Prompt telemetry limits: item caps per section plus an approximate token budget (~4 chars/token)
+_PROMPT_MAX_LOGS = 10
+_PROMPT_MAX_SPANS = 10
+_PROMPT_TELEMETRY_TOKEN_BUDGET = int(os.getenv('RCA_PROMPT_TELEMETRY_TOKENS', '2000'))
+_ERROR_SEVERITIES = frozenset(('ERROR', 'CRITICAL'))
+
+# Evidence keyword sets, each compiled into one alternation so content is scanned once per set
+_BACKEND_TERMS_RE = re.compile('timeout|connection|service|database')
+_UI_TERMS_RE = re.compile('selector|element|locator')
+
+# Mock telemetry used when MCP is unavailable; only the log's trace_id varies per call.
+# The timestamp is fixed at import time and the trace spans are shared, so treat them as read-only
+_MOCK_LOG: Dict[str, Any] = {
+    'timestamp': datetime.now().isoformat(),
+    'severity': 'ERROR',
+    'message': 'Service connection failed: connection refused',
+    'service': 'unknown-service',
+}
+_MOCK_TRACES: Dict[str, Any] = {
+    'spans': [
+        {
+            'name': 'service-call',
+            'service': 'unknown-service',
+            'status': {'code': 2, 'message': 'Internal Server Error'},
+            'duration': '5.0s'
+        }
+    ]
+}
+
+
 class FailureClassification(Enum):
     """Classification types for test failures"""
     UI_BRITTLENESS = "UI Brittleness"
@@ -55,7 +124,7 @@ class FailureClassification(Enum):
     UNKNOWN = "Unknown"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ErrorDetails:
     """Error details from Playwright test failure"""
     message: str
@@ -63,7 +132,7 @@ class ErrorDetails:
     type: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FailurePayload:
     """Payload received from Playwright webhook"""
     test_title: str
@@ -76,7 +145,7 @@ class FailurePayload:
     timestamp: Optional[datetime] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Evidence:
     """Evidence collected during analysis"""
     type: str  # 'log', 'trace', 'metric'
@@ -87,7 +156,7 @@ class Evidence:
     service_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AnalysisResult:
     """Result of RCA analysis"""
     classification: FailureClassification
@@ -99,15 +168,15 @@ class AnalysisResult:
     trace_id: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ServiceNode:
     """Represents a discovered microservice in the topology"""
     name: str
-    endpoints: List[str]
-    dependencies: List[str]  # Services this service calls
-    dependents: List[str]   # Services that call this service
-    error_patterns: List[str]
-    health_indicators: Dict[str, Any]
+    endpoints: Set[str] = field(default_factory=set)
+    dependencies: Set[str] = field(default_factory=set)  # Services this service calls
+    dependents: Set[str] = field(default_factory=set)   # Services that call this service
+    error_patterns: Set[str] = field(default_factory=set)
+    health_indicators: Dict[str, Any] = field(default_factory=dict)
     criticality_score: float = 0.0  # 0-1 based on dependency count and error frequency
 
 
@@ -140,10 +209,18 @@ class ServiceTopology:
 
 class MicroserviceTopologyDiscovery:
     """Discovers microservice topology from distributed traces and logs"""
+
+    # Evidence weights used when scoring failing-service candidates
+    _SEVERITY_SCORE = MappingProxyType({'CRITICAL': 1.0, 'ERROR': 0.8, 'WARNING': 0.4})
+    _EVIDENCE_SCORE = MappingProxyType({'trace': 1.0, 'log': 0.8, 'metric': 0.6})
     
     def __init__(self):
         self.discovered_topology: Optional[ServiceTopology] = None
         self.service_patterns = {}  # Learned patterns for each service
+        # Service name per span (keyed by id(span)), filled once per discovery run
+        self._name_cache: Dict[int, Optional[str]] = {}
+        # Longest path per service for the cyclic critical-path search, filled and cleared per run
+        self._longest_from: Dict[str, List[str]] = {}
         
     async def discover_topology_from_traces(self, traces_data: Dict[str, Any]) -> ServiceTopology:
         """
@@ -161,38 +238,48 @@ class MicroserviceTopologyDiscovery:
         # Analyze spans to build service map
         spans = traces_data.get('spans', [])
         
+        # Empty or single-span input (e.g. mock telemetry): no call edges, nothing to search
+        if len(spans) < 2:
+            return self._trivial_topology(spans)
+        
+        # Index spans by id (either field name) so parent lookups are O(1); the first span with an id wins.
+        # Each span's service name is resolved once here and reused for parents and entry points
+        span_index: Dict[str, Dict[str, Any]] = {}
+        spans_by_service: Dict[str, List[Dict[str, Any]]] = {}
+        name_cache = self._name_cache = {}
+        for span in spans:
+            for span_id in (span.get('span_id'), span.get('spanId')):
+                if span_id:
+                    span_index.setdefault(span_id, span)
+            name = name_cache[id(span)] = self._extract_service_name(span)
+            if name:
+                spans_by_service.setdefault(name, []).append(span)
+        
         for span in spans:
-            service_name = self._extract_service_name(span)
+            service_name = name_cache[id(span)]
             if not service_name:
                 continue
                 
             # Initialize service if not seen before
             if service_name not in services:
-                services[service_name] = ServiceNode(
-                    name=service_name,
-                    endpoints=[],
-                    dependencies=[],
-                    dependents=[],
-                    error_patterns=[],
-                    health_indicators={}
-                )
+                services[service_name] = ServiceNode(name=service_name)
                 call_graph[service_name] = []
             
             # Extract service information from span
             self._analyze_span_for_service_info(span, services[service_name])
             
             # Build call graph from parent-child relationships
-            parent_service = self._extract_parent_service(span, spans)
+            parent_service = self._extract_parent_service(span, span_index)
             if parent_service and parent_service != service_name:
-                if service_name not in call_graph[parent_service]:
-                    call_graph[parent_service].append(service_name)
+                # dependents mirrors call_graph, so it doubles as the O(1) membership check for the edge
                 if parent_service not in services[service_name].dependents:
-                    services[service_name].dependents.append(parent_service)
-                if service_name not in services[parent_service].dependencies:
-                    services[parent_service].dependencies.append(service_name)
+                    services[service_name].dependents.add(parent_service)
+                    services[parent_service].dependencies.add(service_name)
+                    call_graph[parent_service].append(service_name)
         
         # Identify entry points (services with no dependents or HTTP ingress)
-        entry_points = self._identify_entry_points(services, spans)
+        entry_points = self._identify_entry_points(services, spans_by_service)
+        self._name_cache = {}
         
         # Calculate critical path
         critical_path = self._calculate_critical_path(services, call_graph, entry_points)
@@ -211,6 +298,26 @@ class MicroserviceTopologyDiscovery:
         self.discovered_topology = topology
         return topology
     
+    def _trivial_topology(self, spans: List[Dict[str, Any]]) -> ServiceTopology:
+        """Topology for at most one span: its service (if any) is the sole entry point and critical path"""
+        services = {}
+        service_name = self._extract_service_name(spans[0]) if spans else None
+        if service_name:
+            services[service_name] = ServiceNode(name=service_name)
+            self._analyze_span_for_service_info(spans[0], services[service_name])
+        
+        topology = ServiceTopology(
+            services=services,
+            call_graph={name: [] for name in services},
+            entry_points=list(services),
+            critical_path=list(services)
+        )
+        for node in services.values():
+            node.criticality_score = topology.get_service_criticality(node.name)
+        
+        self.discovered_topology = topology
+        return topology
+    
     def _extract_service_name(self, span: Dict[str, Any]) -> Optional[str]:
         """Extract service name from span data"""
         # Try multiple common fields for service name
@@ -239,14 +346,14 @@ class MicroserviceTopologyDiscovery:
         """Extract service information from individual span"""
         # Extract endpoints
         http_url = span.get('attributes', {}).get('http.url')
-        if http_url and http_url not in service.endpoints:
-            service.endpoints.append(http_url)
+        if http_url:
+            service.endpoints.add(http_url)
         
         # Extract error patterns
         if span.get('status', {}).get('code', 0) != 0:
             error_msg = span.get('status', {}).get('message', '')
-            if error_msg and error_msg not in service.error_patterns:
-                service.error_patterns.append(error_msg)
+            if error_msg:
+                service.error_patterns.add(error_msg)
         
         # Update health indicators
         status_code = span.get('status', {}).get('code', 0)
@@ -258,20 +365,17 @@ class MicroserviceTopologyDiscovery:
         if status_code != 0:
             service.health_indicators['error_count'] += 1
     
-    def _extract_parent_service(self, span: Dict[str, Any], all_spans: List[Dict]) -> Optional[str]:
+    def _extract_parent_service(self, span: Dict[str, Any], span_index: Dict[str, Dict]) -> Optional[str]:
         """Find parent service for this span"""
         parent_span_id = span.get('parent_span_id') or span.get('parentSpanId')
         if not parent_span_id:
             return None
         
-        # Find parent span
-        for parent_span in all_spans:
-            if parent_span.get('span_id') == parent_span_id or parent_span.get('spanId') == parent_span_id:
-                return self._extract_service_name(parent_span)
-        
-        return None
+        parent_span = span_index.get(parent_span_id)
+        return self._name_cache[id(parent_span)] if parent_span is not None else None
     
-    def _identify_entry_points(self, services: Dict[str, ServiceNode], spans: List[Dict]) -> List[str]:
+    def _identify_entry_points(self, services: Dict[str, ServiceNode],
+                               spans_by_service: Dict[str, List[Dict]]) -> List[str]:
         """Identify services that are entry points to the system"""
         entry_points = []
         
@@ -280,8 +384,7 @@ class MicroserviceTopologyDiscovery:
             has_http_ingress = any(
                 span.get('attributes', {}).get('http.method') in ['GET', 'POST', 'PUT', 'DELETE']
                 and span.get('attributes', {}).get('http.route')
-                for span in spans
-                if self._extract_service_name(span) == service_name
+                for span in spans_by_service.get(service_name, ())
             )
             
             # Entry point if: has HTTP ingress OR has no dependents
@@ -298,30 +401,112 @@ class MicroserviceTopologyDiscovery:
             return []
         
         # Simple heuristic: longest path from entry point with most dependencies
+        order = self._topological_order(call_graph)
+        if order is not None:
+            return self._longest_dag_path(order, call_graph, entry_points)
+
+        # Cyclic call graph: fall back to the backtracking search over simple paths
         longest_path = []
+        self._longest_from.clear()
         
         for entry_point in entry_points:
-            path = self._find_longest_path(entry_point, call_graph, set())
+            path, _ = self._find_longest_path(entry_point, call_graph, set())
             if len(path) > len(longest_path):
                 longest_path = path
         
+        self._longest_from.clear()
         return longest_path
+
+    def _topological_order(self, call_graph: Dict[str, List[str]]) -> Optional[List[str]]:
+        """Kahn's algorithm over the call graph; None when it contains a cycle"""
+        indegree: Dict[str, int] = dict.fromkeys(call_graph, 0)
+        for dependencies in call_graph.values():
+            for dependency in dependencies:
+                indegree[dependency] = indegree.get(dependency, 0) + 1
+
+        order = [service for service, degree in indegree.items() if degree == 0]
+        for service in order:  # order grows while iterating
+            for dependency in call_graph.get(service, ()):
+                indegree[dependency] -= 1
+                if indegree[dependency] == 0:
+                    order.append(dependency)
+
+        return order if len(order) == len(indegree) else None
+
+    def _longest_dag_path(self, order: List[str], call_graph: Dict[str, List[str]],
+                          entry_points: List[str]) -> List[str]:
+        """Longest path from any entry point in an acyclic call graph, by DP in reverse topological order.
+
+        Ties resolve like the DFS: the first longest dependency and the first longest entry point win.
+        """
+        length: Dict[str, int] = {}
+        next_service: Dict[str, Optional[str]] = {}
+        for service in reversed(order):
+            best_length, best_next = 0, None
+            for dependency in call_graph.get(service, ()):
+                if length[dependency] > best_length:
+                    best_length, best_next = length[dependency], dependency
+            length[service] = best_length + 1
+            next_service[service] = best_next
+
+        start, start_length = None, 0
+        for entry_point in entry_points:
+            entry_length = length.get(entry_point, 1)
+            if entry_length > start_length:
+                start, start_length = entry_point, entry_length
+
+        path = []
+        while start is not None:
+            path.append(start)
+            start = next_service.get(start)
+        return path
     
     def _find_longest_path(self, service: str, call_graph: Dict[str, List[str]], 
-                          visited: set) -> List[str]:
-        """Find longest path from a service using DFS"""
+                          visited: set) -> Tuple[List[str], bool]:
+        """Find longest path from a service using backtracking DFS with an explicit stack.
+
+        Also returns whether the search was cut short by a service already on the path. Uncut
+        results do not depend on visited, so they are memoized in self._longest_from.
+        """
+        memo = self._longest_from
+        cached = memo.get(service)
+        if cached is not None:
+            return cached, False
         if service in visited:
-            return []
+            return [], True
         
+        # Frame: [service, dependency iterator, longest subpath so far, cut]
         visited.add(service)
-        longest_subpath = []
-        
-        for dependency in call_graph.get(service, []):
-            subpath = self._find_longest_path(dependency, call_graph, visited.copy())
-            if len(subpath) > len(longest_subpath):
-                longest_subpath = subpath
+        stack = [[service, iter(call_graph.get(service, ())), [], False]]
         
-        return [service] + longest_subpath
+        while True:
+            frame = stack[-1]
+            dependency = next(frame[1], None)
+            if dependency is not None:
+                subpath = memo.get(dependency)
+                if subpath is None:
+                    if dependency not in visited:
+                        visited.add(dependency)
+                        stack.append([dependency, iter(call_graph.get(dependency, ())), [], False])
+                        continue
+                    subpath, frame[3] = [], True
+                if len(subpath) > len(frame[2]):
+                    frame[2] = subpath
+                continue
+            
+            # All dependencies explored: finish this service and hand its path to the caller frame
+            stack.pop()
+            current, _, longest_subpath, cut = frame
+            visited.discard(current)
+            path = [current] + longest_subpath
+            if not cut:
+                memo[current] = path
+            if not stack:
+                return path, cut
+            parent = stack[-1]
+            parent[3] = parent[3] or cut
+            if len(path) > len(parent[2]):
+                parent[2] = path
     
     def identify_failing_service_from_topology(self, error_evidence: List[Evidence]) -> Optional[str]:
         """
@@ -336,27 +521,30 @@ class MicroserviceTopologyDiscovery:
         if not self.discovered_topology or not error_evidence:
             return None
         
-        service_error_scores = {}
+        services = self.discovered_topology.services
+        service_error_scores: Dict[str, float] = {}
+        service_order: Dict[str, int] = {}
+        best_name: Optional[str] = None
+        best_score = -1.0
         
         for evidence in error_evidence:
-            if evidence.service_name and evidence.service_name in self.discovered_topology.services:
-                service = self.discovered_topology.services[evidence.service_name]
-                
+            name = evidence.service_name
+            if name and name in services:
                 # Score based on: error severity + service criticality + evidence type
-                severity_score = {'CRITICAL': 1.0, 'ERROR': 0.8, 'WARNING': 0.4}.get(evidence.severity, 0.2)
-                evidence_score = {'trace': 1.0, 'log': 0.8, 'metric': 0.6}.get(evidence.type, 0.5)
+                severity_score = self._SEVERITY_SCORE.get(evidence.severity, 0.2)
+                evidence_score = self._EVIDENCE_SCORE.get(evidence.type, 0.5)
                 
-                total_score = severity_score * service.criticality_score * evidence_score
+                total_score = service_error_scores.get(name, 0) + (
+                    severity_score * services[name].criticality_score * evidence_score
+                )
+                service_error_scores[name] = total_score
+                order = service_order.setdefault(name, len(service_order))
                 
-                if evidence.service_name not in service_error_scores:
-                    service_error_scores[evidence.service_name] = 0
-                service_error_scores[evidence.service_name] += total_score
+                # Track the highest score as we go; ties go to the service seen first
+                if total_score > best_score or (total_score == best_score and order < service_order[best_name]):
+                    best_name, best_score = name, total_score
         
-        # Return service with highest error score
-        if service_error_scores:
-            return max(service_error_scores.items(), key=lambda x: x[1])[0]
-        
-        return None
+        return best_name
 
 
 @dataclass
@@ -386,7 +574,21 @@ class RCAAgent:
 
         # Initialize Gemini client directly
         self.gemini_model = None
+        self._generation_config = {
+            "response_mime_type": "application/json",
+            "response_schema": _ANALYSIS_RESPONSE_SCHEMA,
+        }
+        self._batch_generation_config = {
+            "response_mime_type": "application/json",
+            "response_schema": {"type": "ARRAY", "items": _ANALYSIS_RESPONSE_SCHEMA},
+        }
+        genai = None
         if GENAI_AVAILABLE:
+            try:
+                import google.generativeai as genai
+            except ImportError:
+                genai = None
+        if genai is not None:
             genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
             self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')  # Use available model
             self.logger.info("Initialized direct Gemini client")
@@ -396,11 +598,23 @@ class RCAAgent:
         # A2A client for communication
         self.a2a_client = None
 
-        # MCP session for telemetry
+        # MCP sessions for telemetry, one long-lived server process per server name.
+        # Each session is owned by a task that keeps its stdio/session contexts open until closed
         self.mcp_session = None
+        self._mcp_sessions: Dict[str, Any] = {}
+        self._mcp_session_tasks: Dict[str, asyncio.Task] = {}
+        self._mcp_session_closers: Dict[str, asyncio.Event] = {}
+        self._mcp_session_lock = asyncio.Lock()
 
         # Analysis state
         self.active_analyses: Dict[str, asyncio.Task] = {}
+
+        # Gemini micro-batching: prompts arriving within the window share one request (0 disables)
+        self._batch_window = float(os.getenv('RCA_GEMINI_BATCH_WINDOW_MS', '0')) / 1000.0
+        self._max_batch = max(1, int(os.getenv('RCA_GEMINI_MAX_BATCH', '8')))
+        self._batch_queue: Optional[asyncio.Queue] = None
+        self._batch_flusher_task: Optional[asyncio.Task] = None
+        self._batch_requests: Set[asyncio.Task] = set()
         
         # Topology discovery state
         self.discovered_topology: Optional[ServiceTopology] = None
@@ -440,8 +654,10 @@ Always provide structured analysis with:
 Be thorough but concise. Use evidence to support your conclusions.
 """
 
-    def _create_rca_tools(self) -> List[FunctionTool]:
+    def _create_rca_tools(self) -> List[Any]:
         """Create RCA-specific tools for the agent"""
+        from google.adk.tools import FunctionTool
+
         return [
             FunctionTool(
                 func=self._collect_telemetry_tool
@@ -526,8 +742,7 @@ Be thorough but concise. Use evidence to support your conclusions.
                 # Extract text from the first content item
                 content = telemetry_data.content[0]
                 if hasattr(content, 'text'):
-                    import json
-                    parsed_data = json.loads(content.text)
+                    parsed_data = _json_loads(content.text)
                     
                     if "raw_data" in parsed_data:
                         raw_data = parsed_data["raw_data"]
@@ -552,27 +767,7 @@ Be thorough but concise. Use evidence to support your conclusions.
 
     def _get_mock_telemetry(self, trace_id: str) -> Dict[str, Any]:
         """Get mock telemetry for testing - application agnostic"""
-        return {
-            'logs': [
-                {
-                    'timestamp': datetime.now().isoformat(),
-                    'severity': 'ERROR',
-                    'message': 'Service connection failed: connection refused',
-                    'service': 'unknown-service',
-                    'trace_id': trace_id
-                }
-            ],
-            'traces': {
-                'spans': [
-                    {
-                        'name': 'service-call',
-                        'service': 'unknown-service',
-                        'status': {'code': 2, 'message': 'Internal Server Error'},
-                        'duration': '5.0s'
-                    }
-                ]
-            }
-        }
+        return {'logs': [{**_MOCK_LOG, 'trace_id': trace_id}], 'traces': _MOCK_TRACES}
 
     async def _discover_topology_from_traces(self, traces_data: Dict[str, Any]) -> ServiceTopology:
         """Discover service topology from traces using dynamic discovery"""
@@ -596,9 +791,9 @@ Be thorough but concise. Use evidence to support your conclusions.
 
         for evidence in evidence_list:
             content = evidence.get('content', '').lower()
-            if any(term in content for term in ['timeout', 'connection', 'service', 'database']):
+            if _BACKEND_TERMS_RE.search(content):
                 backend_errors += 1
-            elif any(term in content for term in ['selector', 'element', 'locator']):
+            elif _UI_TERMS_RE.search(content):
                 ui_indicators += 1
 
         return {
@@ -619,10 +814,48 @@ Be thorough but concise. Use evidence to support your conclusions.
                 self.logger.warning("MCP modules not available, using mock response")
                 return {}
 
-            server_scripts = {
-                "gcp-observability": "mcp-servers/gcp_observability_server.py",
-            }
+            session = await self._get_mcp_session(server_name)
+            try:
+                return await session.call_tool(tool_name, params)
+            except Exception:
+                # The server may have died; start a fresh one on the next call
+                await self._close_mcp_session(server_name)
+                raise
 
+        except Exception as e:
+            self.logger.warning(f"MCP tool call failed: {e}")
+            return {}
+
+    async def _get_mcp_session(self, server_name: str) -> Any:
+        """Return the cached MCP session for a server, starting the server on first use"""
+        session = self._mcp_sessions.get(server_name)
+        if session is not None:
+            return session
+        async with self._mcp_session_lock:
+            session = self._mcp_sessions.get(server_name)
+            if session is None:
+                ready = asyncio.get_running_loop().create_future()
+                closer = asyncio.Event()
+                self._mcp_session_closers[server_name] = closer
+                self._mcp_session_tasks[server_name] = asyncio.create_task(
+                    self._run_mcp_session(server_name, ready, closer)
+                )
+                session = self._mcp_sessions[server_name] = await ready
+            return session
+
+    async def _run_mcp_session(self, server_name: str, ready: asyncio.Future, closer: asyncio.Event):
+        """Own one MCP server process and session until closer is set.
+
+        stdio_client's contexts must be exited by the task that entered them, so they live here
+        rather than in whichever request first needed the session.
+        """
+        from mcp import ClientSession, StdioServerParameters
+        from mcp.client.stdio import stdio_client
+
+        server_scripts = {
+            "gcp-observability": "mcp-servers/gcp_observability_server.py",
+        }
+        try:
             script_path = server_scripts.get(server_name)
             if not script_path:
                 raise ValueError(f"Unknown MCP server: {server_name}")
@@ -640,16 +873,48 @@ Be thorough but concise. Use evidence to support your conclusions.
             async with stdio_client(server_params) as (read, write):
                 async with ClientSession(read, write) as session:
                     await session.initialize()
-                    result = await session.call_tool(tool_name, params)
-                    return result
-
+                    ready.set_result(session)
+                    await closer.wait()
         except Exception as e:
-            self.logger.warning(f"MCP tool call failed: {e}")
-            return {}
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                self.logger.warning(f"MCP session for {server_name} ended: {e}")
+        finally:
+            self._mcp_sessions.pop(server_name, None)
+            self._mcp_session_tasks.pop(server_name, None)
+            self._mcp_session_closers.pop(server_name, None)
+
+    async def _close_mcp_session(self, server_name: str):
+        """Shut down a cached MCP session and its server process"""
+        self._mcp_sessions.pop(server_name, None)
+        closer = self._mcp_session_closers.get(server_name)
+        task = self._mcp_session_tasks.get(server_name)
+        if closer is not None:
+            closer.set()
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def aclose(self):
+        """Close all cached MCP sessions and stop Gemini batching, failing any prompts still pending"""
+        flusher, queue = self._batch_flusher_task, self._batch_queue
+        self._batch_flusher_task = self._batch_queue = None
+        pending_tasks = [task for task in (flusher, *self._batch_requests) if task is not None]
+        for task in pending_tasks:
+            task.cancel()
+        await asyncio.gather(*pending_tasks, return_exceptions=True)
+        if queue is not None:
+            pending = []
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            self._fail_batch(pending, RuntimeError("RCA agent closed"))
+        await asyncio.gather(*(self._close_mcp_session(name) for name in list(self._mcp_session_tasks)))
 
     async def initialize_a2a(self):
         """Initialize A2A client"""
         try:
+            from a2a.client import Client, ClientConfig
+
             config = ClientConfig(
                 server_url=os.getenv('A2A_SERVER_URL', 'http://localhost:8001'),
                 api_key=os.getenv('A2A_API_KEY')
@@ -662,58 +927,219 @@ Be thorough but concise. Use evidence to support your conclusions.
     async def analyze_failure(self, failure_data: Dict[str, Any]) -> Dict[str, Any]:
         """Main analysis method - uses Gemini LLM for root cause analysis"""
         try:
-            # Extract failure information
-            trace_id = failure_data.get('trace_id', str(uuid.uuid4()))
-            error_message = failure_data.get('error_message', 'Unknown error')
-            test_title = failure_data.get('test_title', 'Test failure')
-
-            # Collect telemetry using MCP tools
-            telemetry = await self._collect_telemetry(trace_id)
-
-            # Build evidence list
-            evidence = self._build_evidence_list(telemetry)
-
-            # Format analysis prompt for Gemini
-            analysis_prompt = self._format_analysis_prompt(
-                test_title=test_title,
-                error_message=error_message,
-                trace_id=trace_id,
-                telemetry=telemetry,
-                evidence=evidence
-            )
+            trace_id, evidence, analysis_prompt = await self._prepare_analysis(failure_data)
 
-            # Use Gemini LLM for analysis
-            self.logger.info(f"Sending analysis request to Gemini for trace {trace_id}")
-            
             if self.gemini_model:
-                response = await self.gemini_model.generate_content_async(analysis_prompt)
-                gemini_response = response
+                response = await self._generate_analysis(trace_id, analysis_prompt)
             else:
                 raise Exception("Gemini model not available")
 
-            # Parse Gemini response
-            analysis_result = self._parse_gemini_response(response)
+            return self._finish_analysis(response, trace_id, evidence)
 
-            # Add metadata
-            analysis_result.update({
-                "evidence_count": len(evidence),
-                "trace_id": trace_id,
-                "analysis_duration": 0.0  # Could be calculated if needed
-            })
+        except Exception as e:
+            return self._failed_analysis(failure_data, e)
 
-            self.logger.info(f"Gemini analysis completed for trace {trace_id}: {analysis_result.get('classification')}")
-            return analysis_result
+    async def analyze_failure_stream(self, failure_data: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of analyze_failure.
+
+        Yields a partial {"partial": True, "classification": ...} as soon as Gemini has emitted the
+        classification, then the same final result analyze_failure would return.
+        """
+        try:
+            trace_id, evidence, analysis_prompt = await self._prepare_analysis(failure_data)
+
+            if not self.gemini_model:
+                raise Exception("Gemini model not available")
+
+            response = await self.gemini_model.generate_content_async(
+                analysis_prompt, generation_config=self._generation_config, stream=True)
+
+            buffer: List[str] = []
+            classification_sent = False
+            async for chunk in response:
+                try:
+                    text = chunk.text
+                except ValueError:
+                    # Chunks without text parts (e.g. safety metadata only)
+                    continue
+                buffer.append(text)
+                if not classification_sent:
+                    match = _PARTIAL_CLASSIFICATION_RE.search(''.join(buffer))
+                    if match:
+                        classification_sent = True
+                        yield {"partial": True, "trace_id": trace_id, "classification": match.group(1)}
+
+            yield self._finish_analysis(''.join(buffer), trace_id, evidence)
 
         except Exception as e:
-            self.logger.error(f"Analysis failed: {e}")
-            return {
-                "classification": "Unknown",
-                "failing_service": None,
-                "summary": f"Analysis failed: {str(e)}",
-                "confidence_score": 0.0,
-                "evidence_count": 0,
-                "trace_id": failure_data.get('trace_id', 'unknown')
-            }
+            yield self._failed_analysis(failure_data, e)
+
+    async def _prepare_analysis(self, failure_data: Dict[str, Any]) -> Tuple[str, List[Dict[str, Any]], str]:
+        """Collect telemetry and evidence for a failure and build its Gemini prompt"""
+        # Extract failure information
+        trace_id = failure_data.get('trace_id', str(uuid.uuid4()))
+        error_message = failure_data.get('error_message', 'Unknown error')
+        test_title = failure_data.get('test_title', 'Test failure')
+
+        # Collect telemetry using MCP tools
+        telemetry = await self._collect_telemetry(trace_id)
+
+        # Build evidence list
+        evidence = self._build_evidence_list(telemetry)
+
+        # Format analysis prompt for Gemini
+        analysis_prompt = self._format_analysis_prompt(
+            test_title=test_title,
+            error_message=error_message,
+            trace_id=trace_id,
+            telemetry=telemetry,
+            evidence=evidence
+        )
+
+        self.logger.info(f"Sending analysis request to Gemini for trace {trace_id}")
+        return trace_id, evidence, analysis_prompt
+
+    def _finish_analysis(self, response: Any, trace_id: str, evidence: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Parse a Gemini response and attach analysis metadata"""
+        analysis_result = self._parse_gemini_response(response)
+
+        # Add metadata
+        analysis_result.update({
+            "evidence_count": len(evidence),
+            "trace_id": trace_id,
+            "analysis_duration": 0.0  # Could be calculated if needed
+        })
+
+        self.logger.info(f"Gemini analysis completed for trace {trace_id}: {analysis_result.get('classification')}")
+        return analysis_result
+
+    def _failed_analysis(self, failure_data: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Result returned when an analysis could not be completed"""
+        self.logger.error(f"Analysis failed: {error}")
+        return {
+            "classification": "Unknown",
+            "failing_service": None,
+            "summary": f"Analysis failed: {str(error)}",
+            "confidence_score": 0.0,
+            "evidence_count": 0,
+            "trace_id": failure_data.get('trace_id', 'unknown')
+        }
+
+    async def _generate_analysis(self, trace_id: str, prompt: str) -> Any:
+        """Send an analysis prompt to Gemini, coalescing with concurrent prompts when batching is enabled"""
+        if self._batch_window <= 0 or self._max_batch <= 1:
+            return await self.gemini_model.generate_content_async(
+                prompt, generation_config=self._generation_config)
+
+        if self._batch_flusher_task is None or self._batch_flusher_task.done():
+            self._batch_queue = asyncio.Queue()
+            self._batch_flusher_task = asyncio.create_task(self._batch_flusher())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._batch_queue.put((trace_id, prompt, future))
+        return await future
+
+    async def _batch_flusher(self):
+        """Collect queued prompts for one batch window and dispatch them together"""
+        loop = asyncio.get_running_loop()
+        queue = self._batch_queue
+        batch = []
+        try:
+            while True:
+                batch = [await queue.get()]
+                deadline = loop.time() + self._batch_window
+                while len(batch) < self._max_batch:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Drop callers that were cancelled while waiting
+                batch = [item for item in batch if not item[2].done()]
+                if batch:
+                    task = asyncio.create_task(self._flush_batch(batch))
+                    self._batch_requests.add(task)
+                    task.add_done_callback(self._batch_requests.discard)
+                batch = []
+        finally:
+            # Stopped mid-window: callers in the batch being collected would otherwise wait forever
+            self._fail_batch(batch, RuntimeError("RCA agent closed"))
+
+    async def _flush_batch(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        """Run one Gemini request for a batch and resolve each caller with its own result"""
+        try:
+            if len(batch) == 1:
+                trace_id, prompt, future = batch[0]
+                response = await self.gemini_model.generate_content_async(
+                    prompt, generation_config=self._generation_config)
+                if not future.done():
+                    future.set_result(response)
+                return
+
+            response = await self.gemini_model.generate_content_async(
+                self._format_batch_prompt(batch), generation_config=self._batch_generation_config)
+            results = self._split_batch_response(response, [trace_id for trace_id, _, _ in batch])
+            for (trace_id, prompt, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if result is None:
+                    # Missing from the batched answer: fall back to a single request for this failure
+                    result = await self.gemini_model.generate_content_async(
+                        prompt, generation_config=self._generation_config)
+                    if future.done():
+                        continue
+                future.set_result(result)
+
+        except Exception as e:
+            self._fail_batch(batch, e)
+        finally:
+            # Cancelled (e.g. by aclose) before every caller was resolved
+            self._fail_batch(batch, RuntimeError("RCA agent closed"))
+
+    @staticmethod
+    def _fail_batch(batch: List[Tuple[str, str, asyncio.Future]], error: Exception):
+        """Resolve every still-pending caller in a batch with an error"""
+        for _, _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    def _format_batch_prompt(self, batch: List[Tuple[str, str, asyncio.Future]]) -> str:
+        """Combine several single-failure prompts into one multi-failure prompt"""
+        prompt = f"""
+You will analyze {len(batch)} independent test failures. Analyze each one separately, following its own instructions.
+
+RESPONSE FORMAT: a JSON array with exactly one object per failure, in the same order, each object using the
+single-failure response format plus a "trace_id" field copied from the failure header.
+"""
+        for index, (trace_id, single_prompt, _) in enumerate(batch, 1):
+            prompt += f"\n===== FAILURE {index} (trace_id: {trace_id}) =====\n{single_prompt}\n"
+        return prompt
+
+    def _split_batch_response(self, response: Any, trace_ids: List[str]) -> List[Optional[str]]:
+        """Split a batched JSON array response into per-failure response texts (None when missing)"""
+        response_text = response.text if hasattr(response, 'text') else str(response)
+        try:
+            items = _json_loads(response_text)
+        except ValueError:
+            # Fenced or prose-wrapped array; failures left unmatched fall back to single requests
+            json_match = _JSON_ARRAY_RE.search(response_text)
+            try:
+                items = _json_loads(json_match.group()) if json_match else []
+            except ValueError:
+                items = []
+        items = [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+        by_trace_id = {item.get('trace_id'): item for item in items if item.get('trace_id')}
+        results: List[Optional[str]] = []
+        for position, trace_id in enumerate(trace_ids):
+            item = by_trace_id.get(trace_id)
+            if item is None and len(items) == len(trace_ids):
+                item = items[position]
+            results.append(_json_dumps(item) if item is not None else None)
+        return results
 
     def _format_analysis_prompt(self, test_title: str, error_message: str, trace_id: str,
                                telemetry: Dict[str, Any], evidence: List[Dict[str, Any]]) -> str:
@@ -730,22 +1156,33 @@ Trace ID: {trace_id}
 TELEMETRY DATA:
 """
 
+        # Telemetry lines share one character budget; the most relevant items are selected first
+        budget = _PROMPT_TELEMETRY_TOKEN_BUDGET * 4
+
         # Add logs
         logs = telemetry.get('logs', [])
         if logs:
             prompt += "\nLOGS:\n"
-            for log in logs[:10]:  # Limit to first 10 logs
-                prompt += f"- {log.get('service', 'unknown')}: {log.get('message', '')} (severity: {log.get('severity', 'UNKNOWN')})\n"
+            for log in self._select_prompt_logs(logs):
+                line = f"- {log.get('service', 'unknown')}: {log.get('message', '')} (severity: {log.get('severity', 'UNKNOWN')})\n"
+                budget -= len(line)
+                if budget < 0:
+                    break
+                prompt += line
 
         # Add traces
         traces = telemetry.get('traces', {}).get('spans', [])
-        if traces:
+        if traces and budget > 0:
             prompt += "\nTRACE SPANS:\n"
-            for span in traces[:10]:  # Limit to first 10 spans
+            for span in self._select_prompt_spans(traces):
                 status = span.get('status', {})
                 status_code = status.get('code', 0)
                 status_msg = status.get('message', 'OK')
-                prompt += f"- {span.get('service', 'unknown')}: {span.get('name', '')} (status: {status_code} {status_msg})\n"
+                line = f"- {span.get('service', 'unknown')}: {span.get('name', '')} (status: {status_code} {status_msg})\n"
+                budget -= len(line)
+                if budget < 0:
+                    break
+                prompt += line
 
         # Add evidence summary
         if evidence:
@@ -777,6 +1214,42 @@ Analyze this failure and provide your root cause analysis:
 
         return prompt
 
+    def _select_prompt_logs(self, logs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pick logs for the prompt: ERROR/CRITICAL entries first, then the most recent of the rest.
+
+        Logs arrive newest-first (the observability server orders entries by descending timestamp),
+        so the leading entries of each group are the most recent.
+        """
+        errors = [log for log in logs if log.get('severity') in _ERROR_SEVERITIES][:_PROMPT_MAX_LOGS]
+        remaining = _PROMPT_MAX_LOGS - len(errors)
+        if remaining <= 0:
+            return errors
+        others = [log for log in logs if log.get('severity') not in _ERROR_SEVERITIES]
+        return errors + others[:remaining]
+
+    def _select_prompt_spans(self, spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pick spans for the prompt: failed spans first, then the slowest"""
+        def rank(span: Dict[str, Any]) -> Tuple[bool, float]:
+            return span.get('status', {}).get('code', 0) != 0, self._span_duration_seconds(span)
+
+        if len(spans) <= _PROMPT_MAX_SPANS:
+            return sorted(spans, key=rank, reverse=True)
+        return heapq.nlargest(_PROMPT_MAX_SPANS, spans, key=rank)
+
+    @staticmethod
+    def _span_duration_seconds(span: Dict[str, Any]) -> float:
+        """Span duration in seconds from numeric or '<n>s' / '<n>ms' values; 0.0 when unknown"""
+        duration = span.get('duration', 0)
+        if isinstance(duration, (int, float)):
+            return float(duration)
+        try:
+            text = str(duration).strip()
+            if text.endswith('ms'):
+                return float(text[:-2]) / 1000.0
+            return float(text.rstrip('s'))
+        except ValueError:
+            return 0.0
+
     def _parse_gemini_response(self, response: Any) -> Dict[str, Any]:
         """Parse Gemini's response into structured analysis result"""
         try:
@@ -788,16 +1261,18 @@ Analyze this failure and provide your root cause analysis:
 
             self.logger.info(f"Gemini response: {response_text}")
 
-            # Try to parse JSON from response
-            import json
-            import re
-
-            # Look for JSON in the response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                parsed = json.loads(json_str)
-
+            # Gemini is asked for application/json against the analysis schema
+            try:
+                parsed = _json_loads(response_text)
+            except ValueError:
+                # Fenced or prose-wrapped JSON, e.g. when JSON mode was not applied
+                json_match = _JSON_BLOCK_RE.search(response_text)
+                try:
+                    parsed = _json_loads(json_match.group()) if json_match else None
+                except ValueError:
+                    parsed = None
+
+            if isinstance(parsed, dict):
                 return {
                     "classification": parsed.get("classification", "Unknown"),
                     "failing_service": parsed.get("failing_service"),
@@ -806,17 +1281,18 @@ Analyze this failure and provide your root cause analysis:
                     "reasoning": parsed.get("reasoning", "")
                 }
 
-            # Fallback: extract information from text
+            # Fallback: extract information from text, lowercased once for all three checks
+            response_lower = response_text.lower()
             classification = "Backend Error"  # Default
-            if "ui brittleness" in response_text.lower():
+            if "ui brittleness" in response_lower:
                 classification = "UI Brittleness"
 
             failing_service = None
-            service_match = re.search(r'(?:failing service|service)[:\s]+([a-zA-Z\-_]+)', response_text, re.IGNORECASE)
+            service_match = _SERVICE_TEXT_RE.search(response_lower)
             if service_match:
-                failing_service = service_match.group(1).lower()
+                failing_service = service_match.group(1)
 
-            confidence_match = re.search(r'confidence[:\s]+([0-9.]+)', response_text, re.IGNORECASE)
+            confidence_match = _CONFIDENCE_TEXT_RE.search(response_lower)
             confidence = float(confidence_match.group(1)) if confidence_match else 0.5
 
             return {
@@ -932,6 +1408,7 @@ Analyze this failure and provide your root cause analysis:
             if not task.done():
                 task.cancel()
         self.active_analyses.clear()
+        await self.aclose()
         self.logger.info("RCA Agent cleanup completed")
 
 
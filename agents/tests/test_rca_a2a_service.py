@@ -0,0 +1,152 @@
+"""
+Tests for the RCA A2A service: construction, routes and the /analyze REST endpoint
+"""
+
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agents.rca_a2a_service import RCAA2AService, AGENT_CARD_WELL_KNOWN_PATH, create_rca_a2a_service
+from agents.rca_agent import AgentConfig
+
+
+def make_config(**metadata) -> AgentConfig:
+    return AgentConfig(
+        agent_id="rca-test",
+        agent_type="rca-a2a",
+        capabilities=["telemetry_analysis"],
+        heartbeat_interval=30,
+        health_check_interval=60,
+        max_concurrent_tasks=5,
+        metadata=metadata
+    )
+
+
+@pytest.fixture
+def service():
+    return RCAA2AService(make_config(), host="localhost", port=8001)
+
+
+@pytest.fixture
+def client(service):
+    return TestClient(service.app)
+
+
+def fake_analysis(evidence_items: int):
+    async def analyze_failure(failure_data):
+        return {
+            "classification": "Backend Error",
+            "failing_service": "cart",
+            "summary": "cart is down",
+            "confidence_score": 0.9,
+            "trace_id": failure_data.get("trace_id", "trace-1"),
+            "evidence": [{"type": "log", "content": f"error {i}"} for i in range(evidence_items)],
+            "evidence_count": evidence_items,
+        }
+    return analyze_failure
+
+
+def test_service_builds_with_analyze_route(service):
+    paths = [getattr(route, "path", None) for route in service.app.routes]
+    assert "/analyze" in paths
+    assert paths[0] == AGENT_CARD_WELL_KNOWN_PATH
+
+
+def test_agent_card_served_from_cache(client, service):
+    response = client.get(AGENT_CARD_WELL_KNOWN_PATH)
+    assert response.status_code == 200
+    assert response.content == service._agent_card_bytes
+    assert response.json()["name"] == service.agent_card.name
+
+
+@pytest.mark.parametrize("evidence_items", [0, 40, 300])
+def test_analyze_returns_result(client, service, monkeypatch, evidence_items):
+    monkeypatch.setattr(service.rca_agent, "analyze_failure", fake_analysis(evidence_items))
+
+    response = client.post("/analyze", json={"failure_payload": {"trace_id": "t-1", "error_message": "boom"}})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "completed"
+    assert body["trace_id"] == "t-1"
+    assert body["failing_service"] == "cart"
+    assert len(body["evidence"]) == evidence_items
+
+
+def test_analyze_rejects_invalid_json(client):
+    response = client.post("/analyze", content=b"{not json", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+
+
+def test_analyze_rejects_empty_payload(client):
+    assert client.post("/analyze", json={}).status_code == 400
+    assert client.post("/analyze", json={"failure_payload": {}}).status_code == 400
+
+
+def run_twice(executor, failure_payload, second_trace_id):
+    async def run():
+        first = await executor.execute("task-1", {"failure_payload": failure_payload})
+        second = await executor.execute("task-2", {"failure_payload": {**failure_payload, "trace_id": second_trace_id}})
+        return first, second
+    return asyncio.run(run())
+
+
+def test_result_cache_off_by_default(service, monkeypatch):
+    calls = []
+
+    async def analyze_failure(failure_data):
+        calls.append(failure_data["trace_id"])
+        return await fake_analysis(1)(failure_data)
+
+    monkeypatch.setattr(service.rca_agent, "analyze_failure", analyze_failure)
+    assert service.agent_executor.cache_ttl == 0
+
+    first, second = run_twice(service.agent_executor, {"trace_id": "t-1", "error_message": "boom"}, "t-2")
+
+    assert calls == ["t-1", "t-2"]
+    assert "cached" not in second
+
+
+def test_cached_result_drops_trace_specific_evidence(monkeypatch):
+    service = RCAA2AService(make_config(rca_result_cache_ttl=60), host="localhost", port=8001)
+    monkeypatch.setattr(service.rca_agent, "analyze_failure", fake_analysis(3))
+
+    first, second = run_twice(service.agent_executor, {"trace_id": "t-1", "error_message": "boom"}, "t-2")
+
+    assert len(first["evidence"]) == 3
+    assert second["cached"] is True
+    assert second["trace_id"] == "t-2"
+    assert second["cached_from_trace_id"] == "t-1"
+    assert not second["evidence"] and second["evidence_count"] == 0
+
+
+def test_analyze_stream_emits_partial_then_result(client, service, monkeypatch):
+    async def analyze_failure_stream(failure_data):
+        yield {"partial": True, "trace_id": failure_data["trace_id"], "classification": "Backend Error"}
+        yield await fake_analysis(2)(failure_data)
+
+    monkeypatch.setattr(service.rca_agent, "analyze_failure_stream", analyze_failure_stream)
+
+    response = client.post("/analyze/stream", json={"failure_payload": {"trace_id": "t-1"}})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0] == {"partial": True, "trace_id": "t-1", "classification": "Backend Error"}
+    assert events[1]["status"] == "completed"
+    assert events[1]["failing_service"] == "cart"
+    assert len(events[1]["evidence"]) == 2
+
+
+def test_analyze_stream_rejects_empty_payload(client):
+    assert client.post("/analyze/stream", json={"failure_payload": {}}).status_code == 400
+
+
+def test_factory_builds_service_with_result_cache_off():
+    service = asyncio.run(create_rca_a2a_service(agent_id="rca-factory-test", host="localhost", port=8001))
+
+    assert service.agent_config.metadata["rca_result_cache_ttl"] == 0
+    assert service.agent_executor.cache_ttl == 0
+    assert TestClient(service.app).post("/analyze", json={}).status_code == 400
@@ -0,0 +1,114 @@
+"""
+Tests for RCA agent prompt building and Gemini response parsing
+"""
+
+import asyncio
+
+import pytest
+
+from agents.rca_agent import MicroserviceTopologyDiscovery, RCAAgent
+
+
+@pytest.fixture
+def agent():
+    return RCAAgent("rca-test")
+
+
+def newest_first_logs(count: int, severity: str, prefix: str):
+    # Same order as the observability server: descending timestamps
+    return [
+        {"timestamp": f"2025-01-01T00:{59 - i:02d}:00", "severity": severity, "message": f"{prefix}{i}"}
+        for i in range(count)
+    ]
+
+
+def test_prompt_logs_keep_errors_then_most_recent(agent):
+    logs = newest_first_logs(15, "INFO", "info-")
+    logs.insert(7, {"timestamp": "2025-01-01T00:52:30", "severity": "ERROR", "message": "boom"})
+
+    selected = agent._select_prompt_logs(logs)
+
+    assert [log["message"] for log in selected] == ["boom"] + [f"info-{i}" for i in range(9)]
+
+
+def test_prompt_logs_cap_errors(agent):
+    logs = newest_first_logs(12, "ERROR", "error-") + newest_first_logs(3, "INFO", "info-")
+
+    selected = agent._select_prompt_logs(logs)
+
+    assert [log["message"] for log in selected] == [f"error-{i}" for i in range(10)]
+
+
+@pytest.mark.parametrize("response_text", [
+    '{"classification": "Backend Error", "failing_service": "cart", "summary": "cart down", "confidence_score": 0.8}',
+    '```json\n{"classification": "Backend Error", "failing_service": "cart", "summary": "cart down", '
+    '"confidence_score": 0.8}\n```',
+    'Here is my analysis:\n{"classification": "Backend Error", "failing_service": "cart", '
+    '"summary": "cart down", "confidence_score": 0.8}\nLet me know if you need more.',
+])
+def test_parse_gemini_response_json(agent, response_text):
+    result = agent._parse_gemini_response(response_text)
+
+    assert result["classification"] == "Backend Error"
+    assert result["failing_service"] == "cart"
+    assert result["summary"] == "cart down"
+    assert result["confidence_score"] == 0.8
+
+
+def test_parse_gemini_response_text_fallback(agent):
+    result = agent._parse_gemini_response("Looks like UI Brittleness. Failing service: checkout, confidence: 0.4")
+
+    assert result["classification"] == "UI Brittleness"
+    assert result["failing_service"] == "checkout"
+    assert result["confidence_score"] == 0.4
+
+
+def test_split_batch_response_fenced_array(agent):
+    response_text = (
+        '```json\n[{"trace_id": "t-2", "classification": "UI Brittleness"}, '
+        '{"trace_id": "t-1", "classification": "Backend Error"}]\n```'
+    )
+
+    results = agent._split_batch_response(response_text, ["t-1", "t-2", "t-3"])
+
+    assert agent._parse_gemini_response(results[0])["classification"] == "Backend Error"
+    assert agent._parse_gemini_response(results[1])["classification"] == "UI Brittleness"
+    assert results[2] is None
+
+
+@pytest.mark.parametrize("call_graph, expected", [
+    # Acyclic: longest chain from the entry point
+    ({"web": ["cart", "auth"], "cart": ["db"], "auth": [], "db": []}, ["web", "cart", "db"]),
+    # Cyclic: simple paths only, the cycle back to web is not followed
+    ({"web": ["cart"], "cart": ["db", "web"], "db": ["cache"], "cache": []}, ["web", "cart", "db", "cache"]),
+])
+def test_critical_path(call_graph, expected):
+    discovery = MicroserviceTopologyDiscovery()
+
+    assert discovery._calculate_critical_path({}, call_graph, ["web"]) == expected
+    assert discovery._longest_from == {}
+
+
+class SlowGemini:
+    async def generate_content_async(self, prompt, generation_config=None):
+        await asyncio.sleep(60)
+
+
+@pytest.mark.parametrize("batch_window", [
+    0.01,  # Batch already sent to Gemini when the agent closes
+    60.0,  # Batch still being collected by the flusher
+])
+def test_aclose_fails_pending_batched_prompts(agent, batch_window):
+    agent.gemini_model = SlowGemini()
+    agent._batch_window = batch_window
+
+    async def run():
+        callers = [asyncio.create_task(agent._generate_analysis(f"t-{i}", "prompt")) for i in range(2)]
+        await asyncio.sleep(0.05)
+        await agent.aclose()
+        return await asyncio.wait_for(asyncio.gather(*callers, return_exceptions=True), 1)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not agent._batch_requests
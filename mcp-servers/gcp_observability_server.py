@@ -277,12 +277,12 @@ class GCPObservabilityServer:
             
             filter_str = " AND ".join(filter_parts)
             
-            # Query logs
-            entries = list(self.logging_client.list_entries(
+            # Query logs (the client is blocking, so page through it in a worker thread)
+            entries = await asyncio.to_thread(lambda: list(self.logging_client.list_entries(
                 filter_=filter_str,
                 order_by=cloud_logging.DESCENDING,
                 max_results=100
-            ))
+            )))
             
             # Format results
             log_data = []
@@ -330,7 +330,8 @@ class GCPObservabilityServer:
             project_name = f"projects/{self.project_id}"
             trace_name = f"{project_name}/traces/{trace_id}"
             
-            trace = self.trace_client.get_trace(
+            trace = await asyncio.to_thread(
+                self.trace_client.get_trace,
                 name=trace_name
             )
             
@@ -368,16 +369,17 @@ class GCPObservabilityServer:
         time_window = arguments.get("time_window", 300)
         
         try:
-            # Get both logs and traces
-            logs_result = await self._get_logs({
-                "trace_id": trace_id,
-                "time_window": time_window
-            })
-            
-            traces_result = await self._get_traces({
-                "trace_id": trace_id,
-                "include_spans": True
-            })
+            # Get logs and traces concurrently; they are independent queries
+            logs_result, traces_result = await asyncio.gather(
+                self._get_logs({
+                    "trace_id": trace_id,
+                    "time_window": time_window
+                }),
+                self._get_traces({
+                    "trace_id": trace_id,
+                    "include_spans": True
+                })
+            )
             
             # Parse results
             logs_data = json.loads(logs_result[0].text)